@@ -1,32 +1,23 @@
-import requests
-import os
+import argparse
+import asyncio
 import csv
-import time
-from akamai.edgegrid import EdgeGridAuth, EdgeRc
-from urllib.parse import urljoin
+import os
+from akamai_client import (DEFAULT_CPCODE_INDEX, DEFAULT_DETAIL_CACHE, DEFAULT_MAX_WORKERS, DEFAULT_QUEUE_SIZE,
+                           AlertStore, AlertTableExport, CheckpointJournal, CpcodeAlertIndex, DetailCache, Flattener,
+                           StreamingCsvWriter, alert_store_path, api_url, checkpoint_path, definition_cpcodes,
+                           initialize_akamai_session, iter_through_queue, load_script, map_ordered)
+from akamai_client.scripts import ALERTS_LIST
 
-def initialize_akamai_session(edgerc_path):
-    """Initializes an Akamai EdgeGrid session."""
-    try:
-        edgerc = EdgeRc(edgerc_path)
-        hostname = edgerc.get('default', 'host')
-        client_token = edgerc.get('default', 'client_token')
-        client_secret = edgerc.get('default', 'client_secret')
-        access_token = edgerc.get('default', 'access_token')
-        session = requests.Session()
-        session.auth = EdgeGridAuth(client_token, client_secret, access_token)
-        session.headers.update({"accept": "application/json"})
-        return session, hostname
-    except Exception as e:
-        print(f"Error initializing Akamai session: {e}")
-        return None, None
+# Details of alerts that never triggered are cached under lastTriggered '-', which never moves; refetch them
+# after this many seconds so edits to their CP codes reach the index.
+UNTRIGGERED_DETAIL_MAX_AGE = 24 * 3600
 
 def get_alert_details(session, hostname, account_switch_key, definition_id):
     """Retrieves alert details for a given definition ID."""
     try:
         path = f"/alerts/v2/alert-summaries/{definition_id}/details"
         params = {"accountSwitchKey": account_switch_key}
-        url = urljoin(f'https://{hostname}', path)
+        url = api_url(hostname, path)
         response = session.get(url, params=params)
         response.raise_for_status()
         return response.json()
@@ -34,83 +25,362 @@ def get_alert_details(session, hostname, account_switch_key, definition_id):
         print(f"Error getting alert details for {definition_id}: {e}")
         return None
 
-def write_filtered_alerts_to_csv(filtered_alerts, filename):
-    """Writes filtered alert details to a CSV file."""
-    if not filtered_alerts:
-        print("No filtered alerts to write to CSV.")
-        return
-
+async def get_alert_details_async(client, account_switch_key, definition_id):
+    """Retrieves alert details for a given definition ID through an AsyncAkamaiClient."""
     try:
-        fieldnames = filtered_alerts[0].keys()
-        file_exists = os.path.isfile(filename)
+        path = f"/alerts/v2/alert-summaries/{definition_id}/details"
+        params = {"accountSwitchKey": account_switch_key}
+        response = await client.get(path, params)
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        print(f"Error getting alert details for {definition_id}: {e}")
+        return None
+
+async def gather_alert_details(client, account_switch_key, definition_ids):
+    """Fetches details for many definition IDs concurrently; returns {definitionId: details or None}.
+
+    Every request is started at once; the client's semaphore decides how many are actually in flight.
+    """
+    definition_ids = [str(definition_id).strip() for definition_id in definition_ids]
+    details = await asyncio.gather(*(get_alert_details_async(client, account_switch_key, definition_id)
+                                     for definition_id in definition_ids))
+    return dict(zip(definition_ids, details))
+
+# Top-level keys become definition_<key>; nested objects add dotted parts, e.g. definition_fieldMap.threshold.
+definition_flattener = Flattener(prefix="definition_")
 
-        with open(filename, mode='a' if file_exists else 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            if not file_exists:
-                writer.writeheader()
+def flatten_alert_definition(row, definition):
+    """Returns a copy of the summary row with the 'definition' dictionary flattened into definition_* columns.
+
+    Nested scalars keep their type in dotted columns and arrays are written as JSON, so the output can be
+    parsed without re-reading Python repr text.
+    """
+    return definition_flattener.flatten(definition, row.copy())
+
+def write_filtered_alerts_to_csv(filtered_alerts, filename, store_path=None):
+    """Upserts filtered alert details into the output store by definitionId and exports a compacted CSV.
+
+    filtered_alerts may be any iterable. Reruns update the row of an alert whose details changed and leave
+    the others alone, so the CSV holds one current row per definitionId instead of growing with every run.
+    The store defaults to the CSV name with a .sqlite3 extension; a CSV written before the store existed is
+    imported into it first. Rows stored before an error are still exported. Returns the number of rows received.
+    """
+    store_path = store_path or alert_store_path(filename)
+    is_new = not os.path.exists(store_path)
+    store = AlertStore(store_path)
+    received = 0
+    try:
+        try:
+            if is_new and os.path.exists(filename):
+                print(f"Importing existing alert details from: {filename}")
+                store.import_csv(filename)
+                store.inserted = store.updated = store.unchanged = 0
             for alert in filtered_alerts:
-                writer.writerow(alert)
-        print(f"✅ Filtered alert details written to: {filename}")
+                store.upsert(alert)
+                received += 1
+        except Exception as e:
+            print(f"❌ Error storing alert details: {e}")
+
+        if received:
+            written = store.export_csv(filename)
+            print(f"✅ {received} filtered alert details stored ({store.inserted} new, {store.updated} changed, "
+                  f"{store.unchanged} unchanged); {written} rows written to: {filename}")
+        else:
+            print("No filtered alerts to write to CSV.")
     except Exception as e:
         print(f"❌ Error writing to CSV: {e}")
+    finally:
+        store.close()
+    return received
+
+def fetch_alert_rows(session, hostname, account_switch_key, rows, max_workers=DEFAULT_MAX_WORKERS, cache=None,
+                     journal=None, export=None, index=None):
+    """Fetches details for each triggered alert row and yields the flattened rows in input order.
+
+    rows may be a lazy iterator; up to max_workers detail requests run concurrently on the shared session.
+    With a DetailCache, alerts whose lastTriggered has not moved since the last fetch are served from it.
+    With a CheckpointJournal, every completed alert is journaled and alerts already in it are not fetched again;
+    the journal is marked complete once all rows have been yielded. With an AlertTableExport, every definition
+    is also written to its normalized tables, and with a CpcodeAlertIndex its CP codes are indexed.
+    """
+    def fetch_details(row):
+        definition_id = str(row['definitionId']).strip()
+        last_triggered = str(row['lastTriggered']).strip()
+        if journal is not None:
+            alert_details = journal.get(definition_id)
+            if alert_details is not None:
+                print(f"--> Resuming alert ID: {definition_id} from checkpoint")
+                return row, alert_details
+        if cache is not None:
+            alert_details = cache.get(account_switch_key, definition_id, last_triggered)
+            if alert_details is not None:
+                print(f"--> Using cached details for alert ID: {definition_id} (lastTriggered unchanged)")
+                return row, alert_details
+
+        print(f"--> Processing alert ID: {definition_id} with lastTriggered: {row['lastTriggered']}")
+        alert_details = get_alert_details(session, hostname, account_switch_key, definition_id)
+        if cache is not None and alert_details and 'definition' in alert_details:
+            cache.put(account_switch_key, definition_id, last_triggered, alert_details)
+        return row, alert_details
+
+    for row, alert_details in map_ordered(fetch_details, rows, max_workers):
+        definition_id = str(row['definitionId']).strip()
+        if alert_details:
+            print(f"Raw response for {definition_id}: {alert_details}")
+            # Use the 'definition' field instead of 'alerts'
+            if 'definition' in alert_details:
+                if journal is not None:
+                    journal.record(definition_id, alert_details)
+                if export is not None:
+                    export.add(row, alert_details['definition'])
+                if index is not None:
+                    index.update(account_switch_key, definition_id, definition_cpcodes(alert_details['definition']))
+                yield flatten_alert_definition(row, alert_details['definition'])
+                print(f"--> Alert definition added for ID: {definition_id}")
+            else:
+                print(f"--> No definition found in response for ID: {definition_id}")
+        else:
+            print(f"--> Failed to fetch alert details for ID: {definition_id}")
+
+    if journal is not None:
+        journal.mark_complete()
+
+def open_checkpoint(output_filename, resume=False):
+    """Opens the checkpoint journal for output_filename, continuing an unfinished run when resume is set."""
+    path = checkpoint_path(output_filename)
+    if os.path.exists(path) and not resume:
+        print(f"Discarding unfinished checkpoint {path}; pass --resume to continue it instead.")
+    journal = CheckpointJournal(path, resume=resume)
+    if resume:
+        print(f"Resuming from checkpoint {path}: {len(journal)} alerts already completed")
+    return journal
+
+def open_table_export(export_path):
+    """Opens the normalized table export, or returns None when export_path is unset or Parquet is unavailable."""
+    if not export_path:
+        return None
+    try:
+        return AlertTableExport(export_path)
+    except ImportError:
+        print(f"❌ Parquet export to {export_path} needs pyarrow (pip install pyarrow); skipping the table export.")
+        return None
+
+def close_table_export(export):
+    if export is not None:
+        export.close()
+        print(f"✅ {export.definitions} alert definitions exported to tables in: {export.path}")
+
+class AlertListing:
+    """What a pass over an alert listing saw: every definitionId, the ones that never triggered, and whether it ended."""
+
+    def __init__(self):
+        self.definition_ids = set()
+        self.untriggered = []
+        self.complete = False
+
+    def add(self, summary, triggered):
+        definition_id = str(summary['definitionId']).strip()
+        self.definition_ids.add(definition_id)
+        if not triggered:
+            self.untriggered.append(definition_id)
+
+def index_listed_definitions(session, hostname, account_switch_key, listing, index, max_workers=DEFAULT_MAX_WORKERS,
+                             cache=None):
+    """Indexes the CP codes of the listed alerts that never triggered and drops definitions no longer listed.
+
+    Triggered alerts are indexed while their details are fetched; the others are only fetched here (served from
+    the DetailCache when fetched within UNTRIGGERED_DETAIL_MAX_AGE) so the index covers every definition.
+    Definitions missing from the listing are only removed when the listing was read to the end.
+    """
+    def fetch_definition(definition_id):
+        alert_details = None
+        if cache is not None:
+            alert_details = cache.get(account_switch_key, definition_id, '-', UNTRIGGERED_DETAIL_MAX_AGE)
+        if alert_details is None:
+            alert_details = get_alert_details(session, hostname, account_switch_key, definition_id)
+            if cache is not None and alert_details and 'definition' in alert_details:
+                cache.put(account_switch_key, definition_id, '-', alert_details)
+        return definition_id, alert_details
 
-def read_and_process_alerts(edgerc_path, account_switch_key, input_filename="alerts.csv", output_filename=None):
-    """Reads alerts.csv, fetches details for rows with non '-' in 'lastTriggered', and writes to a new CSV."""
+    indexed = 0
+    for definition_id, alert_details in map_ordered(fetch_definition, listing.untriggered, max_workers):
+        if alert_details and 'definition' in alert_details:
+            index.update(account_switch_key, definition_id, definition_cpcodes(alert_details['definition']))
+            indexed += 1
+    print(f"CP code index: {indexed} of {len(listing.untriggered)} untriggered alert definitions indexed")
+    if listing.complete:
+        removed = index.retain(account_switch_key, listing.definition_ids)
+        if removed:
+            print(f"CP code index: {removed} entries of definitions no longer listed removed")
+
+def close_cpcode_index(index, account_switch_key):
+    if index is not None:
+        cpcodes, definitions = index.stats(account_switch_key)
+        print(f"CP code index: {cpcodes} CP codes watched by {definitions} alert definitions ({index.path})")
+        index.close()
+
+def close_checkpoint(journal):
+    journal.close()
+    if journal.complete:
+        print(f"Checkpoint: {journal.resumed} alerts reused from the journal")
+    else:
+        print(f"⚠️ Run did not finish; rerun with --resume to continue from checkpoint {journal.path}")
+
+def read_and_process_alerts(edgerc_path, account_switch_key, input_filename="alerts.csv", output_filename=None,
+                            max_workers=DEFAULT_MAX_WORKERS, cache_path=DEFAULT_DETAIL_CACHE, resume=False,
+                            export_path=None, index_path=None):
+    """Reads alerts.csv, fetches details for rows with non '-' in 'lastTriggered', and writes to a new CSV.
+
+    Details are fetched concurrently by up to max_workers threads sharing one session; rows keep the input order.
+    Details are cached in cache_path and only re-fetched when lastTriggered moves; pass None to disable.
+    Completed alerts are journaled next to the output; with resume=True an interrupted run skips them.
+    export_path additionally writes normalized definitions/targets/recipients/parameters tables linked by
+    definitionId: a SQLite database, or a directory of Parquet files when it ends in .parquet. With index_path
+    (e.g. DEFAULT_CPCODE_INDEX), the CP codes each listed definition targets, triggered or not, are indexed there
+    for lookups by CP code; this also fetches the details of every alert that never triggered.
+    """
     if output_filename is None:
         output_filename = f"{account_switch_key}_alerts_details.csv"  # Compute default value here
 
-    filtered_alerts = []
+    session, hostname = initialize_akamai_session(edgerc_path, pool_maxsize=max_workers)
+    if not session:
+        return
+
+    cache = DetailCache(cache_path) if cache_path else None
+    journal = None
+    export = open_table_export(export_path)
+    index = CpcodeAlertIndex(index_path) if index_path else None
     try:
+        listing = AlertListing()
+        triggered = []
         with open(input_filename, mode='r', newline='', encoding='utf-8') as infile:
-            reader = csv.DictReader(infile)
-
-            for row in reader:
-                if row['lastTriggered'].strip() != '-':
-                    definition_id = row['definitionId'].strip()
-                    print(f"--> Processing alert ID: {definition_id} with lastTriggered: {row['lastTriggered']}")
-
-                    # Reinitialize session for each request
-                    session, hostname = initialize_akamai_session(edgerc_path)
-                    if not session:
-                        continue
-
-                    # Fetch alert details from API
-                    alert_details = get_alert_details(session, hostname, account_switch_key, definition_id)
-
-                    if alert_details:
-                        print(f"Raw response for {definition_id}: {alert_details}")
-                        # Use the 'definition' field instead of 'alerts'
-                        if 'definition' in alert_details:
-                            alert_row = row.copy()
-                            # Flatten the 'definition' dictionary into the row
-                            for key, value in alert_details['definition'].items():
-                                # Convert lists or complex objects to strings to avoid CSV issues
-                                if isinstance(value, (list, dict)):
-                                    alert_row[f"definition_{key}"] = str(value)
-                                else:
-                                    alert_row[f"definition_{key}"] = value
-                            filtered_alerts.append(alert_row)
-                            print(f"--> Alert definition added for ID: {definition_id}")
-                        else:
-                            print(f"--> No definition found in response for ID: {definition_id}")
-                    else:
-                        print(f"--> Failed to fetch alert details for ID: {definition_id}")
-
-                    time.sleep(1)  # Avoid rate limiting
-
-        # Write all filtered alerts to the output CSV
-        if filtered_alerts:
-            write_filtered_alerts_to_csv(filtered_alerts, output_filename)
-        else:
+            for row in csv.DictReader(infile):
+                is_row_triggered = row['lastTriggered'].strip() != '-'
+                listing.add(row, is_row_triggered)
+                if is_row_triggered:
+                    triggered.append(row)
+        listing.complete = True
+
+        # Stream alerts to the output CSV as their details arrive
+        journal = open_checkpoint(output_filename, resume)
+        alert_rows = fetch_alert_rows(session, hostname, account_switch_key, triggered, max_workers, cache, journal,
+                                      export, index)
+        if not write_filtered_alerts_to_csv(alert_rows, output_filename):
             print("No alerts processed.")
+        if index is not None:
+            index_listed_definitions(session, hostname, account_switch_key, listing, index, max_workers, cache)
 
     except FileNotFoundError:
         print(f"❌ Error: File '{input_filename}' not found.")
     except Exception as e:
         print(f"❌ Error reading CSV: {e}")
+    finally:
+        if journal is not None:
+            close_checkpoint(journal)
+        close_table_export(export)
+        close_cpcode_index(index, account_switch_key)
+        if cache is not None:
+            cache.report()
+            cache.close()
+
+    session.retry_stats.report()
+    session.single_flight.report()
+
+def is_triggered(summary):
+    """True for alert summaries that have actually fired (a real lastTriggered timestamp)."""
+    return summary.get('lastTriggered') not in (None, '', '-')
+
+def iter_triggered_alerts(summaries, summaries_writer=None, listing=None):
+    """Yields the triggered summaries, optionally writing every summary to summaries_writer on the way.
+
+    With an AlertListing, every summary is also recorded in it, and it is marked complete once summaries ends.
+    """
+    for summary in summaries:
+        if summaries_writer is not None:
+            summaries_writer.writerow(summary)
+        triggered = is_triggered(summary)
+        if listing is not None:
+            listing.add(summary, triggered)
+        if triggered:
+            yield summary
+    if listing is not None:
+        listing.complete = True
+
+def run_alert_pipeline(edgerc_path, account_switch_key, output_filename=None, summaries_filename=None,
+                       max_workers=DEFAULT_MAX_WORKERS, queue_size=DEFAULT_QUEUE_SIZE, cache_path=DEFAULT_DETAIL_CACHE,
+                       resume=False, export_path=None, index_path=None):
+    """Lists alert summaries and fetches details for the triggered ones in one process, with no intermediate file.
+
+    Summaries are streamed from the Alerts API on a producer thread and handed to the detail fetcher through
+    a bounded queue of queue_size, so detail requests start while the listing is still being read. Pass
+    summaries_filename to also keep the Step 1 summary CSV. Details are cached in cache_path, checkpointed
+    (resume), exported to normalized tables (export_path) and indexed by CP code (index_path) as in
+    read_and_process_alerts.
+    """
+    if output_filename is None:
+        output_filename = f"{account_switch_key}_alerts_details.csv"
+
+    session, hostname = initialize_akamai_session(edgerc_path, pool_maxsize=max_workers + 1)
+    if not session:
+        return
+
+    alerts_list = load_script(ALERTS_LIST)
+    summaries_writer = StreamingCsvWriter(summaries_filename) if summaries_filename else None
+    cache = DetailCache(cache_path) if cache_path else None
+    journal = open_checkpoint(output_filename, resume)
+    export = open_table_export(export_path)
+    index = CpcodeAlertIndex(index_path) if index_path else None
+    listing = AlertListing() if index is not None else None
+    triggered = alert_rows = None
+    try:
+        summaries = alerts_list.iter_alerts(session, hostname, account_switch_key)
+        triggered = iter_through_queue(iter_triggered_alerts(summaries, summaries_writer, listing), queue_size)
+        alert_rows = fetch_alert_rows(session, hostname, account_switch_key, triggered, max_workers, cache, journal,
+                                      export, index)
+        if not write_filtered_alerts_to_csv(alert_rows, output_filename):
+            print("No alerts processed.")
+        if listing is not None:
+            # Joins the listing producer first, so the listing is final before it is read.
+            triggered.close()
+            index_listed_definitions(session, hostname, account_switch_key, listing, index, max_workers, cache)
+    except Exception as e:
+        print(f"❌ Error running alert pipeline: {e}")
+    finally:
+        # Stop the detail workers and join the listing producer before closing what they write to.
+        if alert_rows is not None:
+            alert_rows.close()
+        if triggered is not None:
+            triggered.close()
+        if summaries_writer is not None:
+            summaries_writer.close()
+            print(f"Alert summaries written to: {summaries_filename}")
+        close_checkpoint(journal)
+        close_table_export(export)
+        close_cpcode_index(index, account_switch_key)
+        if cache is not None:
+            cache.report()
+            cache.close()
+
+    session.retry_stats.report()
+    session.single_flight.report()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch details for triggered alerts.")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue an interrupted run, skipping alerts already in its checkpoint")
+    parser.add_argument('--export', metavar='PATH',
+                        help="also write normalized alert tables to a SQLite file, or Parquet files if PATH ends in .parquet")
+    parser.add_argument('--index', metavar='PATH', nargs='?', const=DEFAULT_CPCODE_INDEX,
+                        help="also index the CP codes of every listed alert, triggered or not, for the unmonitored "
+                             f"CP code report (default: {DEFAULT_CPCODE_INDEX})")
+    args = parser.parse_args()
+
     edgerc_path = "/Users/afrolov/.edgerc"  # Replace with your .edgerc path
     # account_switch_key      # Define account_switch_key here
 
-    read_and_process_alerts(edgerc_path, account_switch_key = "F-AC-997250")
+    read_and_process_alerts(edgerc_path, account_switch_key = "F-AC-997250", resume=args.resume,
+                            export_path=args.export, index_path=args.index)
+    # Or list and fetch in one go, without the Step 1 CSV:
+    # run_alert_pipeline(edgerc_path, account_switch_key = "F-AC-997250", resume=args.resume,
+    #                    export_path=args.export, index_path=args.index)
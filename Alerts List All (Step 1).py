@@ -1,13 +1,9 @@
 import requests
-import pandas as pd
-from akamai.edgegrid import EdgeGridAuth, EdgeRc
-from urllib.parse import urljoin
+from akamai_client import AsyncAkamaiClient, api_url, get_session, iter_json_array, write_rows_to_csv
 import logging
-from typing import Dict, Optional, Any, List
+from typing import Dict, Iterator, Optional, Any, List
 import json
 
-# Set up logging configuration
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("akamai_api")
 
 def initialize_akamai_session(edgerc_path: str, section: str = 'default'):
@@ -15,14 +11,7 @@ def initialize_akamai_session(edgerc_path: str, section: str = 'default'):
     Set up the authenticated session using EdgeGrid authentication.
     """
     try:
-        edgerc = EdgeRc(edgerc_path)
-        hostname = edgerc.get(section, 'host')
-        client_token = edgerc.get(section, 'client_token')
-        client_secret = edgerc.get(section, 'client_secret')
-        access_token = edgerc.get(section, 'access_token')
-        session = requests.Session()
-        session.auth = EdgeGridAuth(client_token, client_secret, access_token)
-        session.headers.update({"accept": "application/json"})
+        session, hostname = get_session(edgerc_path, section)
         logger.info(f"Successfully initialized Akamai client with host: {hostname}")
         return session, hostname
     except Exception as e:
@@ -36,7 +25,7 @@ def read_only_request(session: requests.Session, hostname: str, path: str,
     """
     if not session:
         raise ValueError("Session not initialized. Check your credentials and .edgerc file.")
-    url = urljoin(f'https://{hostname}', path)
+    url = api_url(hostname, path)
     try:
         logger.info(f"Making GET request to {url}")
         response = session.get(url, params=params)
@@ -54,6 +43,32 @@ def get_alerts(session: requests.Session, hostname: str, account_switch_key: str
     params = {"accountSwitchKey": account_switch_key}
     return read_only_request(session, hostname, path, params).json()
 
+async def get_alerts_async(client: AsyncAkamaiClient, account_switch_key: str) -> Dict[str, Any]:
+    """Retrieve alerts from the Alerts API through an AsyncAkamaiClient (async counterpart of get_alerts)."""
+    path = "/alerts/v2/alert-summaries"
+    params = {"accountSwitchKey": account_switch_key}
+    logger.info(f"Making async GET request to {path}")
+    response = await client.get(path, params)
+    response.raise_for_status()
+    return response.json()
+
+def iter_alerts(session: requests.Session, hostname: str, account_switch_key: str) -> Iterator[Dict[str, Any]]:
+    """Yield alert summaries one at a time while the Alerts API response is still downloading."""
+    url = api_url(hostname, "/alerts/v2/alert-summaries")
+    params = {"accountSwitchKey": account_switch_key}
+    logger.info(f"Streaming alert summaries from {url}")
+    with session.get(url, params=params, stream=True) as response:
+        response.raise_for_status()
+        yield from iter_json_array(response.iter_content(chunk_size=65536), "data")
+
+def alerts_dataframe(alert_data: List[Dict[str, Any]]):
+    """Return alert summaries as a pandas DataFrame with missing values filled with '-'.
+
+    pandas is imported here, on demand, so the CSV export path never pays for it.
+    """
+    import pandas as pd
+    return pd.DataFrame(alert_data).fillna("-")
+
 def test_read_api(session: requests.Session, hostname: str, switch_key: str):
     """
     Run test API reads: fetch alert summaries and alert definitions,
@@ -62,7 +77,7 @@ def test_read_api(session: requests.Session, hostname: str, switch_key: str):
     # Fetch alert summaries
     logger.info("Fetching alert summaries from /alerts/v2/alert-summaries...")
     try:
-        summaries_url = f"https://{hostname}/alerts/v2/alert-summaries"
+        summaries_url = api_url(hostname, "/alerts/v2/alert-summaries")
         params = {"accountSwitchKey": switch_key}
         response = session.get(summaries_url, params=params)
 
@@ -77,9 +92,9 @@ def test_read_api(session: requests.Session, hostname: str, switch_key: str):
         alert_data = summaries_json.get("data", [])
         if alert_data:
             print(f"Found {len(alert_data)} alerts.")
-            alerts_df = pd.DataFrame(alert_data)
-            alerts_df.fillna("-").to_csv(f"{switch_key}_alerts.csv", index=False)
-            print("Alerts successfully written to alerts.csv")
+            output_filename = f"{switch_key}_alerts.csv"
+            write_rows_to_csv(alert_data, output_filename)
+            print(f"Alerts successfully written to {output_filename}")
         else:
             print("No alerts data found.")
             with open("../../../alerts.csv", "w", encoding='utf-8') as f:
@@ -90,7 +105,10 @@ def test_read_api(session: requests.Session, hostname: str, switch_key: str):
             f.write(f"Error fetching alert summaries: {str(e)}\n")
 
 if __name__ == "__main__":
+    # Set up logging configuration
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     edgerc_path = "/Users/afrolov/.edgerc"  # Update if needed
     session, hostname = initialize_akamai_session(edgerc_path)
     print("\nEXECUTING READ-ONLY OPERATIONS - NO CHANGES WILL BE MADE TO AKAMAI CONFIGURATION\n")
     test_read_api(session, hostname, switch_key="F-AC-997250")
+    session.retry_stats.report()
@@ -2,32 +2,15 @@ import requests
 import os
 import csv
 import json
-from akamai.edgegrid import EdgeGridAuth, EdgeRc
-from urllib.parse import urljoin
-
-
-def initialize_akamai_session(edgerc_path):
-    """Initializes an Akamai EdgeGrid session."""
-    try:
-        edgerc = EdgeRc(edgerc_path)
-        hostname = edgerc.get('default', 'host')
-        client_token = edgerc.get('default', 'client_token')
-        client_secret = edgerc.get('default', 'client_secret')
-        access_token = edgerc.get('default', 'access_token')
-        session = requests.Session()
-        session.auth = EdgeGridAuth(client_token, client_secret, access_token)
-        session.headers.update({"accept": "application/json"})
-        return session, hostname
-    except Exception as e:
-        print(f"Error initializing Akamai session: {e}")
-        return None, None
+from akamai_client import (DEFAULT_CPCODE_INDEX, CpcodeAlertIndex, StreamingCsvWriter, api_url,
+                           initialize_akamai_session, iter_json_array)
 
 
 def get_all_cpcodes(session, hostname, account_switch_key=None):
     """Fetches all CP codes from the Akamai CPRG API."""
     try:
         path = "/cprg/v1/cpcodes"
-        url = urljoin(f'https://{hostname}', path)
+        url = api_url(hostname, path)
         params = {"accountSwitchKey": account_switch_key} if account_switch_key else {}
         response = session.get(url, params=params)
         response.raise_for_status()
@@ -37,31 +20,40 @@ def get_all_cpcodes(session, hostname, account_switch_key=None):
         return None
 
 
-def write_cpcodes_to_csv(cpcode_data, account_switch_key, filename_prefix="All"):
-    """Writes raw CP code data to a CSV file."""
-    if not cpcode_data or 'cpcodes' not in cpcode_data or not cpcode_data['cpcodes']:
-        print("No CP code data to write to CSV.")
-        return None
-
+async def get_all_cpcodes_async(client, account_switch_key=None):
+    """Fetches all CP codes from the Akamai CPRG API through an AsyncAkamaiClient."""
     try:
-        filename = f"{filename_prefix}_{account_switch_key}_CPcodes.csv"
-        fieldnames = cpcode_data['cpcodes'][0].keys()
-        with open(filename, mode='w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for cpcode in cpcode_data['cpcodes']:
-                writer.writerow(cpcode)
-        print(f"✅ Raw CP codes written to: {filename}")
-        return filename
+        path = "/cprg/v1/cpcodes"
+        params = {"accountSwitchKey": account_switch_key} if account_switch_key else {}
+        response = await client.get(path, params)
+        response.raise_for_status()
+        return response.json()
     except Exception as e:
-        print(f"❌ Error writing to CSV: {e}")
+        print(f"Error fetching CP codes: {e}")
         return None
 
 
+def iter_cpcodes(session, hostname, account_switch_key=None, chunk_size=65536):
+    """Yields CP code records one at a time while the CPRG API response is still downloading."""
+    path = "/cprg/v1/cpcodes"
+    url = api_url(hostname, path)
+    params = {"accountSwitchKey": account_switch_key} if account_switch_key else {}
+    with session.get(url, params=params, stream=True) as response:
+        response.raise_for_status()
+        yield from iter_json_array(response.iter_content(chunk_size=chunk_size), 'cpcodes')
+
+
+def _decode(value):
+    """Returns nested API values as-is and parses the repr strings found in older raw CSVs."""
+    if isinstance(value, str):
+        return json.loads(value.replace("'", '"'))
+    return value
+
+
 def clean_contracts(contracts_str):
     """Cleans contracts field into 'Expired:C-14DACIX,Ongoing:C-14D88N9' format."""
     try:
-        contracts = json.loads(contracts_str.replace("'", '"'))
+        contracts = _decode(contracts_str)
         filtered = [f"{c['status'].capitalize()}:{c['contractId']}" for c in contracts if
                     'contractId' in c and 'status' in c]
         return ",".join(filtered) if filtered else ""
@@ -72,16 +64,16 @@ def clean_contracts(contracts_str):
 def clean_timezone(timezone_str):
     """Cleans overrideTimezone to show only the timezone value, e.g., 'GMT 0'."""
     try:
-        timezone_dict = json.loads(timezone_str.replace("'", '"'))
+        timezone_dict = _decode(timezone_str)
         return timezone_dict.get('timezoneValue', timezone_str).replace(" (Greenwich Mean Time)", "")
-    except (json.JSONDecodeError, TypeError):
+    except (json.JSONDecodeError, TypeError, AttributeError):
         return timezone_str  # Return original if parsing fails
 
 
 def clean_products(products_str):
     """Cleans products to show all product names, e.g., 'AdaptiveMediaDelivery, Progressive_Media'."""
     try:
-        products = json.loads(products_str.replace("'", '"'))
+        products = _decode(products_str)
         if isinstance(products, list) and products:
             # Extract base product names from productId, removing the namespace prefix before '::'
             product_names = [
@@ -97,19 +89,76 @@ def clean_access_group(access_group_str):
     """Cleans accessGroup to show only the contractId, e.g., 'C-14D88N9', without surrounding JSON."""
     try:
         # Remove the JSON structure and extract just the contractId value
-        access_group = json.loads(access_group_str.replace("'", '"'))
+        access_group = _decode(access_group_str)
         return access_group.get('contractId', access_group_str)
-    except (json.JSONDecodeError, TypeError):
+    except (json.JSONDecodeError, TypeError, AttributeError):
         # If parsing fails, try to extract the contractId manually
-        if "contractId" in access_group_str:
+        if isinstance(access_group_str, str) and "contractId" in access_group_str:
             start = access_group_str.find("'contractId': '") + len("'contractId': '")
             end = access_group_str.find("'", start)
             return access_group_str[start:end]
         return access_group_str  # Return original if all else fails
 
 
+def clean_cpcode_record(record):
+    """Returns a copy of a CP code record (decoded JSON or raw CSV row) with the nested columns cleaned."""
+    row = dict(record)
+    for column, clean in (('overrideTimezone', clean_timezone), ('contracts', clean_contracts),
+                          ('products', clean_products), ('accessGroup', clean_access_group)):
+        if column in row:
+            row[column] = clean(row[column] if row[column] is not None else '')
+    return row
+
+
+def write_cpcodes_to_csv(cpcode_data, account_switch_key, filename_prefix="All"):
+    """Writes the raw and the cleaned CP code CSVs in a single pass over the decoded API records.
+
+    cpcode_data is either the decoded API response or an iterable of CP code records (see iter_cpcodes).
+    """
+    if isinstance(cpcode_data, dict):
+        cpcode_data = cpcode_data.get('cpcodes') or []
+    records = iter(cpcode_data or [])
+    try:
+        first = next(records, None)
+    except Exception as e:
+        print(f"Error fetching CP codes: {e}")
+        return None
+    if first is None:
+        print("No CP code data to write to CSV.")
+        return None
+
+    filename = f"{filename_prefix}_{account_switch_key}_CPcodes.csv"
+    cleaned_filename = f"Cleaned_{filename_prefix}_{account_switch_key}_CPcodes.csv"
+    # Both files are only replaced once every record arrived; a failure leaves the previous ones in place.
+    writer = StreamingCsvWriter(filename, missing='')
+    cleaned_writer = StreamingCsvWriter(cleaned_filename, missing='')
+    try:
+        count = 0
+        cpcode = first
+        while cpcode is not None:
+            writer.writerow(cpcode)
+            cleaned_writer.writerow(clean_cpcode_record(cpcode))
+            count += 1
+            try:
+                cpcode = next(records, None)
+            except Exception as e:
+                print(f"❌ Error fetching CP codes after {count} records: {e}")
+                return None
+        writer.close()
+        cleaned_writer.close()
+        print(f"✅ {count} raw CP codes written to: {filename}")
+        print(f"✅ Cleaned CP codes written to: {cleaned_filename}")
+        return filename
+    except Exception as e:
+        print(f"❌ Error writing to CSV: {e}")
+        return None
+    finally:
+        writer.discard()
+        cleaned_writer.discard()
+
+
 def clean_csv(input_filename, account_switch_key):
-    """Reads the raw CSV and writes a cleaned version."""
+    """Reads a previously written raw CSV and writes a cleaned version."""
     if not os.path.exists(input_filename):
         print(f"Input file {input_filename} does not exist.")
         return
@@ -125,35 +174,63 @@ def clean_csv(input_filename, account_switch_key):
 
         for row in reader:
             # Clean specific columns
-            row['overrideTimezone'] = clean_timezone(row['overrideTimezone'])
-            row['contracts'] = clean_contracts(row['contracts'])
-            row['products'] = clean_products(row['products'])
-            row['accessGroup'] = clean_access_group(row['accessGroup'])
-            writer.writerow(row)
+            writer.writerow(clean_cpcode_record(row))
 
     print(f"✅ Cleaned CP codes written to: {output_filename}")
 
 
 def fetch_and_process_cpcodes(edgerc_path, account_switch_key=None):
-    """Fetches CP codes, writes raw CSV, and cleans it."""
+    """Fetches CP codes and writes the raw and cleaned CSVs."""
     session, hostname = initialize_akamai_session(edgerc_path)
     if not session:
         return
 
-    # Fetch CP codes
-    cpcode_data = get_all_cpcodes(session, hostname, account_switch_key)
+    # Stream CP codes from the response straight into the raw and cleaned CSVs
+    if not write_cpcodes_to_csv(iter_cpcodes(session, hostname, account_switch_key), account_switch_key):
+        print("No CP code data returned.")
 
-    if cpcode_data:
-        print("CP codes retrieved successfully:")
-        print(cpcode_data)  # Print full response for verification
+    session.retry_stats.report()
 
-        # Write raw CSV
-        raw_csv = write_cpcodes_to_csv(cpcode_data, account_switch_key)
-        if raw_csv:
-            # Clean the CSV
-            clean_csv(raw_csv, account_switch_key)
-    else:
-        print("No CP code data returned.")
+
+def write_unmonitored_cpcodes(edgerc_path, account_switch_key=None, index_path=DEFAULT_CPCODE_INDEX):
+    """Joins the CP code inventory against the CP code -> alert index and writes the CP codes no alert watches.
+
+    The index is built by the Alerts Details step (run with --index) from every listed alert definition,
+    triggered or not, so run that step first. The CSV only replaces an earlier one once the whole inventory has been read.
+    Returns the output filename, or None if nothing was written.
+    """
+    if not os.path.exists(index_path):
+        print(f"❌ CP code index {index_path} not found; run the Alerts Details step with --index first.")
+        return None
+
+    session, hostname = initialize_akamai_session(edgerc_path)
+    if not session:
+        return None
+
+    index = CpcodeAlertIndex(index_path)
+    output_filename = f"Unmonitored_{account_switch_key}_CPcodes.csv"
+    writer = StreamingCsvWriter(output_filename)
+    try:
+        for record in iter_cpcodes(session, hostname, account_switch_key):
+            if not index.is_monitored(account_switch_key, str(record.get('cpcodeId', '')).strip()):
+                writer.writerow({'cpcodeId': record.get('cpcodeId'), 'cpcodeName': record.get('cpcodeName')})
+        count = writer.rows
+        writer.close()
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching CP codes: {e}")
+        return None
+    finally:
+        writer.discard()
+        index.close()
+
+    session.retry_stats.report()
+    if not count:
+        if os.path.exists(output_filename):
+            os.remove(output_filename)  # An earlier list would name CP codes that are now watched
+        print("Every CP code is watched by at least one alert.")
+        return None
+    print(f"✅ {count} CP codes without alerts written to: {output_filename}")
+    return output_filename
 
 
 if __name__ == "__main__":
@@ -161,3 +238,5 @@ if __name__ == "__main__":
     account_switch_key = "F-AC-997250"  # Replace with your account switch key
 
     fetch_and_process_cpcodes(edgerc_path, account_switch_key)
+    # After the Alerts Details step, list the CP codes no alert watches:
+    # write_unmonitored_cpcodes(edgerc_path, account_switch_key)
@@ -2,49 +2,56 @@ import requests
 import csv
 import json
 import statistics
-from akamai.edgegrid import EdgeGridAuth, EdgeRc
-from urllib.parse import urljoin, urlencode
+from akamai_client import (DEFAULT_FILTER_MEMO, DEFAULT_REPORT_CACHE, FILTERED, UNFILTERED, FilterMemo,
+                           ReportIntervalCache, api_url, initialize_akamai_session)
+from urllib.parse import urlencode
 from datetime import datetime, timedelta, UTC
 
-def initialize_akamai_session(edgerc_path):
-    try:
-        edgerc = EdgeRc(edgerc_path)
-        hostname = edgerc.get('default', 'host')
-        client_token = edgerc.get('default', 'client_token')
-        client_secret = edgerc.get('default', 'client_secret')
-        access_token = edgerc.get('default', 'access_token')
-        session = requests.Session()
-        session.auth = EdgeGridAuth(client_token, client_secret, access_token)
-        session.headers.update({"accept": "application/json"})
-        return session, hostname
-    except Exception as e:
-        print(f"Error initializing Akamai session: {e}")
-        return None, None
+DEFAULT_BATCH_SIZE = 50
+TRAFFIC_REPORT_PATH = "/reporting-api/v1/reports/hits-by-cpcode/versions/1/report-data"
+REPORT_METRICS = "edgeHits,hitsOffload"
+REPORT_FILTERS = "delivery_type=secure,delivery_type=non_secure,ip_version=ipv4,ip_version=ipv6"
+REPORT_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+# Reports are always requested per day, so cached days and fresh requests average the same rows.
+REPORT_INTERVAL = "DAY"
+# Reporting data older than this is final and safe to cache.
+CLOSED_INTERVAL_AGE = timedelta(days=1)
 
-def get_traffic_report(session, hostname, cpcode, account_switch_key=None, include_filters=True):
-    try:
-        path = "/reporting-api/v1/reports/hits-by-cpcode/versions/1/report-data"
-        url = urljoin(f'https://{hostname}', path)
+def report_window(today=None):
+    today = today or datetime.now(UTC)
+    start_date = (today - timedelta(days=14)).replace(hour=0, minute=0, second=0, microsecond=0)
+    end_date = (today - timedelta(days=4)).replace(hour=23, minute=0, second=0, microsecond=0)
+    return start_date, end_date
 
-        today = datetime.now(UTC)
-        start_date = (today - timedelta(days=14)).replace(hour=0, minute=0, second=0, microsecond=0)
-        end_date = (today - timedelta(days=4)).replace(hour=23, minute=0, second=0, microsecond=0)
+def traffic_report_params(cpcodes, account_switch_key=None, include_filters=True, start_date=None, end_date=None):
+    """Builds the query parameters of a hits-by-cpcode report request for one or more CP codes."""
+    if isinstance(cpcodes, (list, tuple)):
+        cpcodes = ",".join(str(cpcode) for cpcode in cpcodes)
 
-        start = start_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-        end = end_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+    if start_date is None or end_date is None:
+        start_date, end_date = report_window()
 
-        params = {
-            "start": start,
-            "end": end,
-            "objectIds": cpcode,
-            "metrics": "edgeHits,hitsOffload"
-        }
+    params = {
+        "start": start_date.strftime(REPORT_TIME_FORMAT),
+        "end": end_date.strftime(REPORT_TIME_FORMAT),
+        "objectIds": cpcodes,
+        "metrics": REPORT_METRICS,
+        "interval": REPORT_INTERVAL
+    }
 
-        if include_filters:
-            params["filters"] = "delivery_type=secure,delivery_type=non_secure,ip_version=ipv4,ip_version=ipv6"
+    if include_filters:
+        params["filters"] = REPORT_FILTERS
 
-        if account_switch_key:
-            params["accountSwitchKey"] = account_switch_key
+    if account_switch_key:
+        params["accountSwitchKey"] = account_switch_key
+    return params
+
+def get_traffic_report(session, hostname, cpcodes, account_switch_key=None, include_filters=True,
+                       start_date=None, end_date=None):
+    """Fetches the hits-by-cpcode report for one CP code or a list of CP codes in a single request."""
+    try:
+        url = api_url(hostname, TRAFFIC_REPORT_PATH)
+        params = traffic_report_params(cpcodes, account_switch_key, include_filters, start_date, end_date)
 
         full_url = f"{url}?{urlencode(params, doseq=True)}"
         print(f"\nRequesting URL: {full_url}")
@@ -60,6 +67,137 @@ def get_traffic_report(session, hostname, cpcode, account_switch_key=None, inclu
         print(f"Error fetching traffic report: {e}")
         return None
 
+async def get_traffic_report_async(client, cpcodes, account_switch_key=None, include_filters=True,
+                                   start_date=None, end_date=None):
+    """Async counterpart of get_traffic_report for use with an AsyncAkamaiClient."""
+    try:
+        params = traffic_report_params(cpcodes, account_switch_key, include_filters, start_date, end_date)
+        full_url = f"{api_url(client.hostname, TRAFFIC_REPORT_PATH)}?{urlencode(params, doseq=True)}"
+        print(f"\nRequesting URL: {full_url}")
+
+        response = await client.get(full_url)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.HTTPError as e:
+        print(f"HTTP Error: {e}")
+        print(f"Response: {e.response.text}")
+        return None
+    except Exception as e:
+        print(f"Error fetching traffic report: {e}")
+        return None
+
+def empty_reports(cpcodes):
+    return {cpcode: {'data': []} for cpcode in cpcodes}
+
+def split_report_by_cpcode(report_data, cpcodes):
+    """Splits a batched report into one {'data': [...]} report per requested CP code."""
+    reports = empty_reports(cpcodes)
+    if not report_data or not isinstance(report_data.get('data'), list):
+        return reports
+
+    for entry in report_data['data']:
+        cpcode = str(entry.get('cpcode', '')).strip()
+        if not cpcode and len(cpcodes) == 1:
+            cpcode = cpcodes[0]
+        if cpcode in reports:
+            reports[cpcode]['data'].append(entry)
+    return reports
+
+def daily_intervals(start_date, end_date):
+    """Splits [start_date, end_date) into day-long (start, end) intervals."""
+    intervals = []
+    day = start_date
+    while day < end_date:
+        intervals.append((day, min(day + timedelta(days=1), end_date)))
+        day += timedelta(days=1)
+    return intervals
+
+def contiguous_ranges(intervals):
+    """Groups consecutive intervals so each gap in the cache costs one request."""
+    ranges = []
+    for interval in intervals:
+        if ranges and ranges[-1][-1][1] == interval[0]:
+            ranges[-1].append(interval)
+        else:
+            ranges.append([interval])
+    return ranges
+
+def row_interval_start(entry):
+    """Returns the UTC start of the reporting day a row belongs to, if the row carries one."""
+    value = entry.get('startdatetime')
+    if value in (None, ''):
+        return None
+    try:
+        if isinstance(value, (int, float)) or str(value).isdigit():
+            return datetime.fromtimestamp(int(value), UTC)
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).astimezone(UTC)
+    except (ValueError, OverflowError):
+        return None
+
+def fetch_cached_reports(session, hostname, cpcodes, account_switch_key, include_filters, cache, today=None):
+    """Returns {cpcode: {'data': rows}} for the report window, or None if a report request failed.
+
+    Each CP code's rows are cached per closed day, so a daily run only requests the days that are
+    new to the window; consecutive missing days are fetched in one request. Rows are returned in
+    day order, exactly as an uncached request for the whole window returns them.
+    """
+    start_date, end_date = report_window(today)
+    closed_before = (today or datetime.now(UTC)) - CLOSED_INTERVAL_AGE
+    account = account_switch_key or hostname
+    filters = REPORT_FILTERS if include_filters else ""
+    intervals = daily_intervals(start_date, end_date)
+
+    def key(interval):
+        return interval[0].strftime(REPORT_TIME_FORMAT), interval[1].strftime(REPORT_TIME_FORMAT)
+
+    days = {cpcode: {} for cpcode in cpcodes}
+    for cpcode in cpcodes:
+        for interval in intervals:
+            cached = cache.get(account, cpcode, REPORT_METRICS, filters, *key(interval))
+            if cached is not None:
+                days[cpcode][interval] = cached
+
+    missing = [interval for interval in intervals if any(interval not in days[cpcode] for cpcode in cpcodes)]
+    for interval_range in contiguous_ranges(missing):
+        requested = [cpcode for cpcode in cpcodes
+                     if any(interval not in days[cpcode] for interval in interval_range)]
+        report_data = get_traffic_report(session, hostname, requested, account_switch_key, include_filters,
+                                         start_date=interval_range[0][0], end_date=interval_range[-1][1])
+        if report_data is None:
+            return None
+        by_start = {interval[0]: interval for interval in interval_range}
+        for cpcode, report in split_report_by_cpcode(report_data, requested).items():
+            fetched = {interval: [] for interval in interval_range}
+            unplaced = []
+            for entry in report['data']:
+                interval = by_start.get(row_interval_start(entry))
+                (fetched[interval] if interval else unplaced).append(entry)
+            for interval, rows in fetched.items():
+                if interval in days[cpcode]:
+                    continue
+                days[cpcode][interval] = rows
+                # Rows that cannot be told apart by day leave the whole range uncached.
+                if not unplaced and interval[1] <= closed_before:
+                    cache.put(account, cpcode, REPORT_METRICS, filters, *key(interval), rows)
+            if unplaced:
+                days[cpcode][interval_range[-1]] = days[cpcode][interval_range[-1]] + unplaced
+
+    return {cpcode: {'data': [row for interval in intervals for row in days[cpcode].get(interval, [])]}
+            for cpcode in cpcodes}
+
+def fetch_reports(session, hostname, cpcodes, account_switch_key, include_filters, cache=None):
+    """Returns {cpcode: {'data': rows}} for a batch of CP codes, or None if the report request failed."""
+    if cache is None:
+        report_data = get_traffic_report(session, hostname, cpcodes, account_switch_key, include_filters)
+        if report_data is None:
+            return None
+        return split_report_by_cpcode(report_data, cpcodes)
+    return fetch_cached_reports(session, hostname, cpcodes, account_switch_key, include_filters, cache)
+
+def batched(items, batch_size):
+    for i in range(0, len(items), batch_size):
+        yield items[i:i + batch_size]
+
 def calculate_traffic_averages(report_data, cpcode):
     edge_hits = []
     hits_offload = []
@@ -104,52 +242,99 @@ def write_results_to_csv(results, output_path):
     except Exception as e:
         print(f"Error writing to CSV: {e}")
 
-def fetch_and_analyze_traffic_report(edgerc_path, csv_path, account_switch_key=None):
+def build_traffic_result(cpcode, report_data):
+    if report_data and report_data.get('data'):
+        avg_edge, avg_offload = calculate_traffic_averages(report_data, cpcode)
+        if avg_edge is not None and avg_offload is not None:
+            print(f"✅ Averages for CP code {cpcode}: edgeHits={avg_edge:.2f}, hitsOffload={avg_offload:.2f}")
+            return {
+                'CPcode': cpcode,
+                'Average_edgeHits': f"{avg_edge:.2f}",
+                'Average_hitsOffload': f"{avg_offload:.2f}",
+                'ReportDataFound': 'Yes'
+            }
+        print(f"No valid metrics in report data for CP code {cpcode}.")
+    else:
+        print(f"❌ Report data not found for {cpcode}.")
+    return {
+        'CPcode': cpcode,
+        'Average_edgeHits': 'N/A',
+        'Average_hitsOffload': 'N/A',
+        'ReportDataFound': 'No'
+    }
+
+def fetch_and_analyze_traffic_report(edgerc_path, csv_path, account_switch_key=None, batch_size=DEFAULT_BATCH_SIZE,
+                                     cache_path=DEFAULT_REPORT_CACHE, memo_path=DEFAULT_FILTER_MEMO):
+    """Fetches traffic reports for every CP code in the CSV, batch_size CP codes per request.
+
+    Closed report days are cached in cache_path so daily runs only request the days new to the window,
+    and memo_path remembers which CP codes need the unfiltered request so they skip the filtered one;
+    pass None to disable either.
+    """
     session, hostname = initialize_akamai_session(edgerc_path)
     if not session:
         return
 
+    cache = ReportIntervalCache(cache_path) if cache_path else None
+    if cache:
+        cache.purge_before(report_window()[0].strftime(REPORT_TIME_FORMAT))
+    memo = FilterMemo(memo_path) if memo_path else None
+    account = account_switch_key or hostname
+
     cpcode_list = read_cp_codes_from_csv(csv_path)
-    results = []
-
-    for cpcode in cpcode_list:
-        print(f"\nFetching report for CP code: {cpcode}")
-        report_data = get_traffic_report(session, hostname, cpcode, account_switch_key, include_filters=True)
-
-        if not report_data or not report_data.get('data'):
-            print(f"No valid data found for CP code {cpcode} with filters. Retrying without filters...")
-            report_data = get_traffic_report(session, hostname, cpcode, account_switch_key, include_filters=False)
-
-        if report_data and report_data.get('data'):
-            avg_edge, avg_offload = calculate_traffic_averages(report_data, cpcode)
-            if avg_edge is not None and avg_offload is not None:
-                print(f"✅ Averages for CP code {cpcode}: edgeHits={avg_edge:.2f}, hitsOffload={avg_offload:.2f}")
-                results.append({
-                    'CPcode': cpcode,
-                    'Average_edgeHits': f"{avg_edge:.2f}",
-                    'Average_hitsOffload': f"{avg_offload:.2f}",
-                    'ReportDataFound': 'Yes'
-                })
-            else:
-                print(f"No valid metrics in report data for CP code {cpcode}.")
-                results.append({
-                    'CPcode': cpcode,
-                    'Average_edgeHits': 'N/A',
-                    'Average_hitsOffload': 'N/A',
-                    'ReportDataFound': 'No'
-                })
-        else:
-            print(f"❌ Report data not found for {cpcode}.")
-            results.append({
-                'CPcode': cpcode,
-                'Average_edgeHits': 'N/A',
-                'Average_hitsOffload': 'N/A',
-                'ReportDataFound': 'No'
-            })
+    batch_size = max(1, batch_size)
+    # Split before batching, so CP codes known to need the unfiltered request never cost a filtered one.
+    known_unfiltered = [cpcode for cpcode in cpcode_list if memo and memo.get(account, cpcode) == UNFILTERED]
+    skipped = set(known_unfiltered)
+    filtered = [cpcode for cpcode in cpcode_list if cpcode not in skipped]
+    reports = {}
+    requests_sent = 0
+    needs_unfiltered = set(skipped)
+
+    for batch in batched(filtered, batch_size):
+        print(f"\nFetching report for CP codes: {', '.join(batch)}")
+        filtered_reports = fetch_reports(session, hostname, batch, account_switch_key, True, cache)
+        requests_sent += 1
+        reports.update(filtered_reports or empty_reports(batch))
+        missing = [cpcode for cpcode in batch if not reports[cpcode]['data']]
+        if missing:
+            print(f"No valid data found for CP codes {', '.join(missing)} with filters. Retrying without filters...")
+            reports.update(fetch_reports(session, hostname, missing, account_switch_key, False, cache)
+                           or empty_reports(missing))
+            requests_sent += 1
+            needs_unfiltered.update(missing)
+
+        # A failed filtered request says nothing about which request shape a CP code needs.
+        if memo and filtered_reports is not None:
+            for cpcode in batch:
+                memo.set(account, cpcode, UNFILTERED if cpcode in missing else FILTERED)
+
+    for batch in batched(known_unfiltered, batch_size):
+        print(f"\nSkipping filtered request for CP codes known to need none: {', '.join(batch)}")
+        reports.update(fetch_reports(session, hostname, batch, account_switch_key, False, cache)
+                       or empty_reports(batch))
+        requests_sent += 1
+
+    if memo:
+        # Without the memo every batch sends the filtered request, plus the unfiltered one if any CP code needs it.
+        requests_without_memo = sum(1 + any(cpcode in needs_unfiltered for cpcode in batch)
+                                    for batch in batched(cpcode_list, batch_size))
+        memo.record_avoided(max(0, requests_without_memo - requests_sent))
+
+    results = [build_traffic_result(cpcode, reports[cpcode]) for cpcode in cpcode_list]
 
     if results:
         write_results_to_csv(results, 'Alerts/Traffic_by_CPcode.csv')
 
+    if cache:
+        print(f"Report cache: {cache.hits} CP code days reused, {cache.misses} CP code days requested")
+        cache.close()
+    if memo:
+        print(f"Filter memo: {memo.avoided} report requests avoided")
+        memo.close()
+    session.retry_stats.report()
+    session.single_flight.report()
+
 if __name__ == "__main__":
     edgerc_path = "/Users/afrolov/.edgerc"        # Your .edgerc path
     csv_path = "Alerts/CPcodes.csv"  # Path to your CPcodes.csv file
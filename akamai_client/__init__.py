@@ -0,0 +1,105 @@
+"""Shared Akamai API client used by the step scripts."""
+from .aio import DEFAULT_ASYNC_CONCURRENCY, AsyncAkamaiClient, AsyncResponse, initialize_async_client
+from .alert_store import AlertStore, alert_store_path
+from .alert_tables import AlertTableExport, normalize_alert_definition
+from .cassette import (CASSETTE_ENV, CASSETTE_MODE_ENV, Cassette, CassetteAdapter, CassetteMissError,
+                       open_cassette)
+from .checkpoint import DEFAULT_CHECKPOINT_BATCH, CheckpointJournal, checkpoint_path
+from .concurrency import DEFAULT_MAX_WORKERS, DEFAULT_QUEUE_SIZE, iter_through_queue, map_ordered
+from .cpcode_index import DEFAULT_CPCODE_INDEX, CpcodeAlertIndex, definition_cpcodes
+from .csvsink import StreamingCsvWriter, write_rows_to_csv
+from .detail_cache import DEFAULT_DETAIL_CACHE, DEFAULT_DETAIL_CACHE_SIZE, DetailCache
+from .filter_memo import DEFAULT_FILTER_MEMO, DEFAULT_FILTER_MEMO_TTL, FILTERED, UNFILTERED, FilterMemo
+from .flatten import Flattener
+from .jsonstream import iter_json_array
+from .latency import LATENCY_SUMMARY_ENV, LatencyAdapter, LatencyHistogram, LatencyRecorder, latency_recorder
+from .ratelimit import AdaptiveRateLimiter, UnlimitedRateLimiter
+from .report_cache import DEFAULT_REPORT_CACHE, ReportIntervalCache
+from .retry import RetryBudget, RetryPolicy, RetryStats
+from .scripts import load_script
+from .session import (
+    DEFAULT_POOL_CONNECTIONS,
+    DEFAULT_POOL_MAXSIZE,
+    HOST_OVERRIDE_ENV,
+    OVERRIDE_USE_EDGERC_ENV,
+    api_url,
+    close_sessions,
+    create_session,
+    get_session,
+    initialize_akamai_session,
+    load_credentials,
+    replay_transport_options,
+    resolve_credentials,
+)
+from .signing import EdgeGridSigner, EdgeGridSignerAuth
+from .transport import AkamaiSession, copy_response, endpoint_key, select_retry_policy
+
+__all__ = [
+    "AdaptiveRateLimiter",
+    "AkamaiSession",
+    "AlertStore",
+    "AlertTableExport",
+    "AsyncAkamaiClient",
+    "AsyncResponse",
+    "CASSETTE_ENV",
+    "CASSETTE_MODE_ENV",
+    "Cassette",
+    "CassetteAdapter",
+    "CassetteMissError",
+    "CheckpointJournal",
+    "CpcodeAlertIndex",
+    "DEFAULT_ASYNC_CONCURRENCY",
+    "DEFAULT_CHECKPOINT_BATCH",
+    "DEFAULT_CPCODE_INDEX",
+    "DEFAULT_DETAIL_CACHE",
+    "DEFAULT_DETAIL_CACHE_SIZE",
+    "DEFAULT_FILTER_MEMO",
+    "DEFAULT_FILTER_MEMO_TTL",
+    "DEFAULT_MAX_WORKERS",
+    "DEFAULT_POOL_CONNECTIONS",
+    "DEFAULT_POOL_MAXSIZE",
+    "DEFAULT_QUEUE_SIZE",
+    "DEFAULT_REPORT_CACHE",
+    "DetailCache",
+    "EdgeGridSigner",
+    "EdgeGridSignerAuth",
+    "FILTERED",
+    "FilterMemo",
+    "Flattener",
+    "HOST_OVERRIDE_ENV",
+    "LATENCY_SUMMARY_ENV",
+    "LatencyAdapter",
+    "LatencyHistogram",
+    "LatencyRecorder",
+    "OVERRIDE_USE_EDGERC_ENV",
+    "ReportIntervalCache",
+    "RetryBudget",
+    "RetryPolicy",
+    "RetryStats",
+    "StreamingCsvWriter",
+    "UNFILTERED",
+    "UnlimitedRateLimiter",
+    "alert_store_path",
+    "api_url",
+    "checkpoint_path",
+    "close_sessions",
+    "copy_response",
+    "create_session",
+    "definition_cpcodes",
+    "endpoint_key",
+    "get_session",
+    "initialize_akamai_session",
+    "initialize_async_client",
+    "iter_json_array",
+    "iter_through_queue",
+    "latency_recorder",
+    "load_credentials",
+    "load_script",
+    "map_ordered",
+    "normalize_alert_definition",
+    "open_cassette",
+    "replay_transport_options",
+    "resolve_credentials",
+    "select_retry_policy",
+    "write_rows_to_csv",
+]
@@ -0,0 +1,175 @@
+"""asyncio EdgeGrid client for fanning out many API calls from one process.
+
+aiohttp is only needed once a client is opened; importing this module does not require it.
+"""
+import asyncio
+import json
+
+import requests
+
+from .ratelimit import AdaptiveRateLimiter
+from .retry import RetryBudget, RetryPolicy, RetryStats
+from .session import DEFAULT_RETRY_POLICIES, api_url, resolve_credentials
+from .signing import EdgeGridSigner
+from .singleflight import COALESCED_METHODS, SingleFlight, request_key
+from .transport import endpoint_key, select_retry_policy
+
+DEFAULT_ASYNC_CONCURRENCY = 64
+DEFAULT_ASYNC_TIMEOUT = 120.0
+DEFAULT_KEEPALIVE_TIMEOUT = 30.0
+
+
+class AsyncResponse:
+    """A fully read response with the subset of the requests.Response API the step scripts use."""
+
+    def __init__(self, status_code, headers, content, url):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            kind = 'Client' if self.status_code < 500 else 'Server'
+            raise requests.exceptions.HTTPError(f"{self.status_code} {kind} Error for url: {self.url}", response=self)
+
+
+class AsyncAkamaiClient:
+    """EdgeGrid-signed aiohttp client with the same rate limiting and retry policies as AkamaiSession.
+
+    At most max_concurrency requests are in flight at once (an asyncio.Semaphore, matched by the
+    size of the keep-alive connection pool), so thousands of calls can be gathered safely. Every
+    attempt is signed afresh with an EdgeGridSigner, as AkamaiSession does. Redirects are not
+    followed, since a redirected request would carry the signature of the original URL. Identical
+    concurrent GETs share one request through single_flight (False disables it); each caller gets its
+    own AsyncResponse.
+    Use it as an async context manager, or call close() when done.
+    """
+
+    def __init__(self, credentials, hostname, max_concurrency=DEFAULT_ASYNC_CONCURRENCY, rate_limiter=None,
+                 default_retry_policy=None, retry_policies=None, retry_budget=None, timeout=DEFAULT_ASYNC_TIMEOUT,
+                 single_flight=None):
+        self.hostname = hostname
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.default_retry_policy = default_retry_policy or RetryPolicy()
+        self.retry_policies = dict(DEFAULT_RETRY_POLICIES if retry_policies is None else retry_policies)
+        self.retry_budget = retry_budget or RetryBudget()
+        self.retry_stats = RetryStats()
+        self.single_flight = SingleFlight() if single_flight is None else single_flight
+        self.headers = {'accept': 'application/json'}
+        self._signer = EdgeGridSigner(credentials['client_token'], credentials['client_secret'],
+                                      credentials['access_token'])
+        self._semaphore = None
+        self._session = None
+
+    async def __aenter__(self):
+        await self._open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _open(self):
+        if self._session is None:
+            import aiohttp
+
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _signed_headers(self, method, url):
+        headers = dict(self.headers)
+        headers['Authorization'] = self._signer.sign(method, url)
+        return headers
+
+    async def _send(self, session, method, url):
+        import yarl
+
+        async with self._semaphore:
+            # encoded=True stops yarl from re-quoting the path and query, so the bytes sent are the ones signed.
+            async with session.request(method, yarl.URL(url, encoded=True), headers=self._signed_headers(method, url),
+                                       allow_redirects=False) as raw:
+                return AsyncResponse(raw.status, raw.headers, await raw.read(), url)
+
+    async def request(self, method, path, params=None):
+        """Sends one request to an API path (or full URL) and returns the AsyncResponse, retrying as configured."""
+        # Encode the query exactly as requests would, so the signed URL is the one sent.
+        prepared = requests.models.PreparedRequest()
+        prepared.prepare_url(path if '://' in path else api_url(self.hostname, path), params)
+        url = prepared.url
+        if not self.single_flight or method.upper() not in COALESCED_METHODS:
+            return await self._send_with_retries(method, url)
+        response, shared = await self.single_flight.do_async(
+            request_key(method, url), lambda: self._send_with_retries(method, url), endpoint_key(url))
+        if shared:
+            response = AsyncResponse(response.status_code, response.headers.copy(), response.content, response.url)
+        return response
+
+    async def _send_with_retries(self, method, url):
+        import aiohttp
+
+        policy = select_retry_policy(url, self.retry_policies, self.default_retry_policy)
+        endpoint = endpoint_key(url)
+        session = await self._open()
+        self.retry_budget.deposit()
+        attempt = 1
+        while True:
+            wait = self.rate_limiter.reserve()
+            while wait:
+                await asyncio.sleep(wait)
+                wait = self.rate_limiter.reserve()
+            try:
+                response = await self._send(session, method, url)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retry = policy.is_idempotent(method)
+                response = None
+                error = e
+            else:
+                self.rate_limiter.update(response.status_code, response.headers)
+                retry = policy.retry_on_status(method, response.status_code)
+                error = None
+
+            budget_exhausted = False
+            if retry and attempt < policy.max_attempts:
+                budget_exhausted = not self.retry_budget.withdraw()
+            if not retry or attempt >= policy.max_attempts or budget_exhausted:
+                self.retry_stats.record(endpoint, attempt - 1, gave_up=retry, budget_exhausted=budget_exhausted)
+                if error is not None:
+                    raise error
+                return response
+
+            await asyncio.sleep(policy.backoff(attempt))
+            attempt += 1
+
+    async def get(self, path, params=None):
+        return await self.request('GET', path, params)
+
+
+def initialize_async_client(edgerc_path, section='default', max_concurrency=DEFAULT_ASYNC_CONCURRENCY,
+                            host_override=None, **transport_options):
+    """Creates an AsyncAkamaiClient for an .edgerc section, resolving the host as get_session() does.
+
+    Returns None (after printing the error) if the credentials cannot be loaded.
+    """
+    try:
+        credentials, hostname = resolve_credentials(edgerc_path, section, host_override)
+    except Exception as e:
+        print(f"Error initializing Akamai async client: {e}")
+        return None
+    return AsyncAkamaiClient(credentials, hostname, max_concurrency, **transport_options)
@@ -0,0 +1,137 @@
+"""Output store of flattened alert detail rows, upserted by definitionId."""
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .csvsink import StreamingCsvWriter
+
+INSERTED = 'inserted'
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+
+# Upserts are committed in batches; a crash loses at most the last few, which the next run rewrites.
+_COMMIT_EVERY = 500
+# Rows read per fetch while streaming the store out.
+_FETCH_SIZE = 500
+
+
+def _csv_text(row):
+    """Returns row as the CSV export renders it: values as text, with None and empty values left out.
+
+    Rows imported from a CSV only have text, so comparing this form keeps an imported row from
+    counting as changed when the API returns the same values with their JSON types.
+    """
+    return {key: str(value) for key, value in row.items() if value is not None and value != ''}
+
+
+def alert_store_path(csv_filename):
+    """Returns the store that backs a CSV export: the same name with a .sqlite3 extension."""
+    return os.path.splitext(csv_filename)[0] + ".sqlite3"
+
+
+class AlertStore:
+    """SQLite-backed table of alert rows with one row per definitionId.
+
+    upsert() only writes a row when its content differs from what is stored, so reruns leave
+    unchanged alerts alone, and export_csv() rewrites a compacted CSV holding the current row of
+    every definition in first-seen order. inserted, updated and unchanged count upserts since the
+    store was opened.
+    """
+
+    def __init__(self, path, clock=time.time):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS alert_rows ("
+            " definition_id TEXT PRIMARY KEY, position INTEGER NOT NULL, payload TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS alert_rows_position ON alert_rows (position)")
+        self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM alert_rows").fetchone()[0]
+
+    def upsert(self, row):
+        """Stores row under its definitionId; returns INSERTED, UPDATED or UNCHANGED."""
+        definition_id = str(row['definitionId']).strip()
+        payload = json.dumps(row, default=str)
+        with self._lock:
+            stored = self._conn.execute("SELECT payload FROM alert_rows WHERE definition_id=?",
+                                        (definition_id,)).fetchone()
+            if stored is None:
+                self._conn.execute(
+                    "INSERT INTO alert_rows VALUES (?, (SELECT COALESCE(MAX(position), 0) + 1 FROM alert_rows), ?, ?)",
+                    (definition_id, payload, self._clock()))
+                self.inserted += 1
+                outcome = INSERTED
+            elif stored[0] == payload:
+                self.unchanged += 1
+                return UNCHANGED
+            elif _csv_text(json.loads(stored[0])) == _csv_text(row):
+                # Same content in another representation (e.g. imported text); keep the typed row quietly.
+                self._conn.execute("UPDATE alert_rows SET payload=? WHERE definition_id=?", (payload, definition_id))
+                self.unchanged += 1
+                outcome = UNCHANGED
+            else:
+                self._conn.execute("UPDATE alert_rows SET payload=?, updated_at=? WHERE definition_id=?",
+                                   (payload, self._clock(), definition_id))
+                self.updated += 1
+                outcome = UPDATED
+            self._pending += 1
+            if self._pending >= _COMMIT_EVERY:
+                self._conn.commit()
+                self._pending = 0
+        return outcome
+
+    def import_csv(self, filename, missing=''):
+        """Loads rows from an existing CSV export; later duplicates of a definitionId win. Returns the row count."""
+        count = 0
+        with open(filename, mode='r', newline='', encoding='utf-8') as infile:
+            for row in csv.DictReader(infile):
+                if not row.get('definitionId'):
+                    continue
+                self.upsert({key: value for key, value in row.items() if key is not None and value != missing})
+                count += 1
+        return count
+
+    def iter_rows(self):
+        """Yields the stored rows in first-seen order, reading them from the database in chunks."""
+        self.flush()
+        with self._lock:
+            cursor = self._conn.execute("SELECT payload FROM alert_rows ORDER BY position")
+        while True:
+            with self._lock:
+                payloads = cursor.fetchmany(_FETCH_SIZE)
+            if not payloads:
+                break
+            for (payload,) in payloads:
+                yield json.loads(payload)
+
+    def export_csv(self, filename, missing=''):
+        """Rewrites filename with one row per definitionId and returns the number of rows written."""
+        with StreamingCsvWriter(filename, missing=missing) as writer:
+            writer.writerows(self.iter_rows())
+        return writer.rows
+
+    def flush(self):
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,168 @@
+"""Normalized export of alert definitions into tables linked by definitionId."""
+import json
+import os
+import sqlite3
+import threading
+
+from .cpcode_index import definition_cpcodes
+
+TABLES = {
+    'definitions': ('definition_id', 'name', 'template_id', 'is_enabled', 'last_triggered', 'definition'),
+    'targets': ('definition_id', 'cpcode'),
+    'recipients': ('definition_id', 'email'),
+    'parameters': ('definition_id', 'name', 'value'),
+}
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS definitions (definition_id TEXT PRIMARY KEY, name TEXT, template_id TEXT,"
+    " is_enabled INTEGER, last_triggered TEXT, definition TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS targets (definition_id TEXT NOT NULL, cpcode TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS recipients (definition_id TEXT NOT NULL, email TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS parameters (definition_id TEXT NOT NULL, name TEXT NOT NULL, value TEXT)",
+    "CREATE INDEX IF NOT EXISTS targets_definition ON targets (definition_id)",
+    "CREATE INDEX IF NOT EXISTS targets_cpcode ON targets (cpcode)",
+    "CREATE INDEX IF NOT EXISTS recipients_definition ON recipients (definition_id)",
+    "CREATE INDEX IF NOT EXISTS recipients_email ON recipients (email)",
+    "CREATE INDEX IF NOT EXISTS parameters_definition ON parameters (definition_id)",
+    "CREATE INDEX IF NOT EXISTS parameters_name ON parameters (name, value)",
+)
+
+# SQLite writes are committed in batches; close() commits the rest.
+_COMMIT_EVERY = 500
+# Parquet rows are buffered per table and written as a row group once this many have accumulated.
+_ROW_GROUP_SIZE = 10000
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _parameter_value(value):
+    return value if value is None or isinstance(value, str) else json.dumps(value)
+
+
+def normalize_alert_definition(row, definition):
+    """Splits one alert definition into {table: [rows]} for the tables in TABLES.
+
+    CP codes in fieldMap.cpcodes become targets, emails become recipients, and the remaining fieldMap
+    and notifications entries become name/value parameters (non-string values as JSON).
+    """
+    definition_id = str(definition.get('definitionId', row.get('definitionId', ''))).strip()
+    field_map = definition.get('fieldMap') or {}
+    notifications = definition.get('notifications') or {}
+    is_enabled = definition.get('isEnabled')
+
+    parameters = [(definition_id, name, _parameter_value(value))
+                  for name, value in field_map.items() if name != 'cpcodes']
+    parameters += [(definition_id, f"notifications.{name}", _parameter_value(value))
+                   for name, value in notifications.items()]
+    return {
+        'definitions': [(definition_id, definition.get('name', row.get('name')),
+                         None if definition.get('templateId') is None else str(definition['templateId']),
+                         None if is_enabled is None else int(bool(is_enabled)),
+                         row.get('lastTriggered'), json.dumps(definition))],
+        'targets': [(definition_id, cpcode) for cpcode in definition_cpcodes(definition)],
+        'recipients': [(definition_id, str(email).strip()) for email in _as_list(definition.get('emails'))],
+        'parameters': parameters,
+    }
+
+
+class AlertTableExport:
+    """Writes normalized alert definitions to SQLite, or to one Parquet file per table.
+
+    A path ending in .parquet is treated as a directory that receives definitions.parquet,
+    targets.parquet, recipients.parquet and parameters.parquet; this needs pyarrow. Rows are written
+    in row groups of up to _ROW_GROUP_SIZE as they arrive, so memory stays bounded however many
+    definitions are exported; a definitionId that was already written is skipped. The files are
+    written under temporary names and put in place by close(). Any other path is a SQLite database
+    whose definitions are upserted and whose child rows are replaced per definitionId, with indexes
+    on the lookup columns. `definitions` counts the definitions actually written.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        self.definitions = 0
+        self._lock = threading.Lock()
+        self._pending = 0
+        if self.parquet:
+            self._open_parquet()
+            return
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def add(self, row, definition):
+        tables = normalize_alert_definition(row, definition)
+        with self._lock:
+            definition_id = tables['definitions'][0][0]
+            if self.parquet:
+                if definition_id not in self._written:
+                    self._written.add(definition_id)
+                    self._buffer_parquet(tables)
+                    self.definitions += 1
+                return
+            self.definitions += 1
+            for table in ('targets', 'recipients', 'parameters'):
+                self._conn.execute(f"DELETE FROM {table} WHERE definition_id=?", (definition_id,))
+            for table, rows in tables.items():
+                placeholders = ", ".join("?" * len(TABLES[table]))
+                verb = "INSERT OR REPLACE" if table == 'definitions' else "INSERT"
+                self._conn.executemany(f"{verb} INTO {table} VALUES ({placeholders})", rows)
+            self._pending += 1
+            if self._pending >= _COMMIT_EVERY:
+                self._conn.commit()
+                self._pending = 0
+
+    def _open_parquet(self):
+        import pyarrow as pa  # Fails before anything is fetched if Parquet output is unavailable
+        import pyarrow.parquet as pq
+
+        os.makedirs(self.path, exist_ok=True)
+        self._written = set()
+        self._buffers = {table: [] for table in TABLES}
+        self._writers = {}
+        for table, columns in TABLES.items():
+            schema = pa.schema([(column, pa.int64() if column == 'is_enabled' else pa.string())
+                                for column in columns])
+            filename = os.path.join(self.path, f"{table}.parquet.tmp")
+            self._writers[table] = pq.ParquetWriter(filename, schema)
+
+    def _buffer_parquet(self, tables):
+        for table, rows in tables.items():
+            buffer = self._buffers[table]
+            buffer.extend(rows)
+            if len(buffer) >= _ROW_GROUP_SIZE:
+                self._write_row_group(table)
+
+    def _write_row_group(self, table):
+        import pyarrow as pa
+
+        rows = self._buffers[table]
+        if rows:
+            writer = self._writers[table]
+            writer.write_table(pa.Table.from_arrays([pa.array([values[index] for values in rows], field.type)
+                                                     for index, field in enumerate(writer.schema)],
+                                                    schema=writer.schema))
+            self._buffers[table] = []
+
+    def _close_parquet(self):
+        for table, writer in self._writers.items():
+            self._write_row_group(table)
+            writer.close()
+            filename = os.path.join(self.path, f"{table}.parquet")
+            os.replace(filename + ".tmp", filename)
+
+    def close(self):
+        with self._lock:
+            if self.parquet:
+                self._close_parquet()
+            else:
+                self._conn.commit()
+                self._conn.close()
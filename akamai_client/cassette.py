@@ -0,0 +1,201 @@
+"""Record/replay of API traffic through gzip-compressed cassette files.
+
+Set AKAMAI_CASSETTE to a file path and AKAMAI_CASSETTE_MODE to one of:
+
+    record          send requests as usual and append every request/response pair to the cassette
+    replay          answer requests from the cassette at full speed, without network or credentials
+    replay-latency  like replay, but wait as long as each recorded response took
+
+e.g. ``AKAMAI_CASSETTE=runs/traffic.jsonl.gz AKAMAI_CASSETTE_MODE=replay python -m cProfile "Traffic ...py"``.
+"""
+import atexit
+import base64
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import timedelta
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from .latency import REPLAYED, LatencyAdapter, RequestTiming, TimedResponse
+
+CASSETTE_ENV = 'AKAMAI_CASSETTE'
+CASSETTE_MODE_ENV = 'AKAMAI_CASSETTE_MODE'
+RECORD = 'record'
+REPLAY = 'replay'
+REPLAY_LATENCY = 'replay-latency'
+MODES = (RECORD, REPLAY, REPLAY_LATENCY)
+
+# Report window parameters; they follow the clock, so they are left out of replay keys.
+TIME_PARAMS = frozenset({'start', 'end'})
+
+# Bodies are stored decoded, so the headers describing the wire encoding no longer apply on replay.
+_WIRE_HEADERS = frozenset({'content-encoding', 'content-length', 'transfer-encoding', 'connection'})
+
+_lock = threading.Lock()
+_cassettes = {}
+
+
+class CassetteMissError(requests.exceptions.RequestException):
+    """Raised on replay when the cassette holds no response for a request."""
+
+
+def cassette_key(method, url):
+    """Returns the replay key of a request: method, path and sorted query pairs; the host is ignored.
+
+    TIME_PARAMS are dropped, so a report recorded on one day is still found when replayed on another.
+    """
+    parts = urlsplit(url)
+    pairs = sorted((k, v) for k, v in parse_qsl(parts.query, True) if k not in TIME_PARAMS)
+    return f"{method.upper()} {parts.path}?{'&'.join(f'{k}={v}' for k, v in pairs)}"
+
+
+class Cassette:
+    """A cassette file opened for recording or replay.
+
+    Recording appends one JSON line per response to a gzip stream and flushes it (Z_SYNC_FLUSH) after
+    every line, so a run that dies still leaves what it recorded; on load, a tail cut off mid-line or
+    without the gzip trailer is ignored. On replay, responses recorded for the same key are
+    served in their recorded order, and the last one is repeated once they run out.
+    """
+
+    def __init__(self, path, mode=REPLAY):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}; expected one of {', '.join(MODES)}")
+        self.path = path
+        self.mode = mode
+        self.recorded = 0
+        self.replayed = 0
+        self.missed = 0
+        self._lock = threading.Lock()
+        self._entries = defaultdict(deque)
+        self._file = None
+        if mode == RECORD:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = gzip.open(path, mode='wt', encoding='utf-8')
+        else:
+            self._load()
+
+    @property
+    def replaying(self):
+        return self.mode != RECORD
+
+    def _load(self):
+        with gzip.open(self.path, mode='rt', encoding='utf-8') as infile:
+            try:
+                for line in infile:
+                    if not line.endswith('\n'):
+                        break  # Torn final write from an interrupted recording
+                    entry = json.loads(line)
+                    # Re-keyed so cassettes recorded before a key change still replay.
+                    self._entries[cassette_key(*entry['key'].split(' ', 1))].append(entry)
+            except (EOFError, ValueError):
+                pass  # The recording was interrupted before the gzip stream was finished
+
+    def record(self, request, response):
+        content = response.content
+        try:
+            body, encoding = content.decode('utf-8'), 'utf-8'
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode('ascii'), 'base64'
+        entry = {
+            'key': cassette_key(request.method, request.url),
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {name: value for name, value in response.headers.items()
+                        if name.lower() not in _WIRE_HEADERS},
+            'body': body,
+            'encoding': encoding,
+            'elapsed': response.elapsed.total_seconds(),
+        }
+        line = json.dumps(entry) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self.recorded += 1
+
+    def play(self, request):
+        """Returns the recorded entry for a request, or raises CassetteMissError."""
+        key = cassette_key(request.method, request.url)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.missed += 1
+                raise CassetteMissError(f"No recorded response for {key} in {self.path}", request=request)
+            entry = entries.popleft() if len(entries) > 1 else entries[0]
+            self.replayed += 1
+        if self.mode == REPLAY_LATENCY:
+            time.sleep(entry['elapsed'])
+        return entry
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                print(f"Cassette {self.path}: {self.recorded} responses recorded")
+            elif self.replayed or self.missed:
+                print(f"Cassette {self.path}: {self.replayed} responses replayed, {self.missed} missing")
+                self.replayed = self.missed = 0
+
+
+class CassetteAdapter(LatencyAdapter):
+    """Transport adapter that records responses to, or replays them from, a Cassette.
+
+    Recorded requests are timed like any other; replayed ones only have their JSON decode timed, under
+    the 'replayed' source so they never mix with live timings.
+    """
+
+    def __init__(self, cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        if not self.cassette.replaying:
+            response = super().send(request, **kwargs)
+            self.cassette.record(request, response)
+            return response
+
+        entry = self.cassette.play(request)
+        body = entry['body'].encode('utf-8') if entry['encoding'] == 'utf-8' else base64.b64decode(entry['body'])
+        response = TimedResponse()
+        response.timing = RequestTiming(self.recorder, request.url, REPLAYED)
+        response.status_code = entry['status']
+        response.reason = entry['reason']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=entry['elapsed'])
+        response.connection = self
+        return response
+
+
+def open_cassette(path, mode):
+    """Returns the process-wide Cassette for path, opening it on first use; it is closed at exit."""
+    with _lock:
+        cassette = _cassettes.get(path)
+        if cassette is None:
+            cassette = _cassettes[path] = Cassette(path, mode)
+            atexit.register(cassette.close)
+        elif cassette.mode != mode:
+            raise ValueError(f"Cassette {path} is already open in {cassette.mode} mode")
+    return cassette
+
+
+def cassette_from_env():
+    """Returns the cassette configured by AKAMAI_CASSETTE / AKAMAI_CASSETTE_MODE, or None."""
+    path = os.environ.get(CASSETTE_ENV)
+    if not path:
+        return None
+    return open_cassette(path, os.environ.get(CASSETTE_MODE_ENV, REPLAY))
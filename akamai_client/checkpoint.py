@@ -0,0 +1,110 @@
+"""Append-only checkpoint journal for long alert-detail runs."""
+import json
+import os
+import threading
+
+DEFAULT_CHECKPOINT_BATCH = 50
+
+
+def checkpoint_path(csv_filename):
+    """Returns the journal that belongs to a CSV output: the same name with a .journal.jsonl extension."""
+    return os.path.splitext(csv_filename)[0] + ".journal.jsonl"
+
+
+class CheckpointJournal:
+    """JSON-lines journal of completed definitionIds and their detail payloads.
+
+    record() buffers entries and writes them to disk, fsynced, every batch_size records and on
+    flush()/close(). With resume=True the journal of an earlier, unfinished run is scanned once and
+    only its definitionIds and line offsets are kept; get() reads a payload back from the file when
+    it is asked for, so memory does not grow with the size of the details. Without resume any earlier
+    journal is discarded. Once a run has been marked complete, close() removes the journal.
+    `resumed` counts entries served by get().
+    """
+
+    def __init__(self, path, resume=False, batch_size=DEFAULT_CHECKPOINT_BATCH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.resumed = 0
+        self.complete = False
+        self._completed = set()
+        self._offsets = {}
+        self._reader = None
+        self._buffer = []
+        self._lock = threading.Lock()
+        if resume and os.path.exists(path):
+            self._load()
+            self._reader = open(path, mode='rb')
+            self._file = open(path, mode='a', encoding='utf-8')
+        else:
+            self._file = open(path, mode='w', encoding='utf-8')
+
+    def _load(self):
+        valid_end = 0
+        with open(self.path, mode='rb') as infile:
+            for line in infile:
+                if not line.endswith(b'\n'):
+                    break  # Torn final write from an interrupted run
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                self._offsets.setdefault(entry['definitionId'], valid_end)
+                valid_end += len(line)
+        if valid_end != os.path.getsize(self.path):
+            with open(self.path, mode='r+b') as outfile:
+                outfile.truncate(valid_end)
+        self._completed.update(self._offsets)
+
+    def __len__(self):
+        return len(self._completed)
+
+    def get(self, definition_id):
+        """Returns the details an earlier run journaled for definition_id, or None if it did not complete it."""
+        with self._lock:
+            offset = self._offsets.get(str(definition_id))
+            if offset is None:
+                return None
+            self._reader.seek(offset)
+            line = self._reader.readline()
+            self.resumed += 1
+        return json.loads(line)['details']
+
+    def record(self, definition_id, details):
+        entry = {'definitionId': str(definition_id), 'details': details}
+        with self._lock:
+            if entry['definitionId'] in self._completed:
+                return
+            self._completed.add(entry['definitionId'])
+            self._buffer.append(json.dumps(entry) + '\n')
+            if len(self._buffer) >= self.batch_size:
+                self._write()
+
+    def _write(self):
+        if self._buffer:
+            self._file.writelines(self._buffer)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._buffer = []
+
+    def mark_complete(self):
+        """Marks the run as finished so close() removes the journal."""
+        self.complete = True
+
+    def flush(self):
+        with self._lock:
+            self._write()
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._write()
+            self._file.close()
+            if self._reader is not None:
+                self._reader.close()
+            if self.complete:
+                os.remove(self.path)
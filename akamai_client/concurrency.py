@@ -0,0 +1,82 @@
+"""Bounded worker pools for fanning API calls out over a shared session."""
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_QUEUE_SIZE = 64
+
+_DONE = object()
+# How often a producer blocked on a full queue checks whether the consumer has gone away.
+_PUT_TIMEOUT = 0.1
+
+
+def map_ordered(func, items, max_workers=DEFAULT_MAX_WORKERS):
+    """Applies func to each item on a bounded thread pool and yields the results in input order.
+
+    At most 2 * max_workers calls are queued at a time, so items may be a lazy iterator.
+    """
+    max_workers = max(1, int(max_workers))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= max_workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def iter_through_queue(items, maxsize=DEFAULT_QUEUE_SIZE):
+    """Drains items on a producer thread into a bounded queue and yields them as they arrive.
+
+    The producer runs ahead by at most maxsize items, so a slow listing overlaps with whatever
+    consumes it. An exception raised by items is re-raised to the consumer after the queued items.
+    When the consumer stops early (break, exception or close()), the producer is told to stop,
+    items is closed, and the producer thread is joined before control returns, so nothing it
+    writes to is still in use afterwards.
+    """
+    buffer = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+    errors = []
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                if not put(item):
+                    break
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            try:
+                close = getattr(iterator, 'close', None)
+                if close is not None:
+                    close()
+            except BaseException as e:
+                errors.append(e)
+            put(_DONE)
+
+    producer = threading.Thread(target=produce, name="queue-producer", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                break
+            yield item
+    finally:
+        stop.set()
+        producer.join()
+    if errors:
+        raise errors[0]
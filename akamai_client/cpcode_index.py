@@ -0,0 +1,104 @@
+"""Persisted inverted index from CP code to the alert definitions that watch it."""
+import os
+import sqlite3
+import threading
+
+DEFAULT_CPCODE_INDEX = os.path.join(".cache", "cpcode_alerts.sqlite3")
+
+_COMMIT_EVERY = 500
+
+
+def definition_cpcodes(definition):
+    """Returns the CP codes an alert definition targets (fieldMap.cpcodes), as stripped strings."""
+    cpcodes = (definition.get('fieldMap') or {}).get('cpcodes')
+    if cpcodes is None:
+        return []
+    if not isinstance(cpcodes, list):
+        cpcodes = [cpcodes]
+    return [str(cpcode).strip() for cpcode in cpcodes]
+
+
+class CpcodeAlertIndex:
+    """SQLite-backed (accountSwitchKey, cpcode) -> definitionIds index.
+
+    The table is clustered on (account, cpcode, definition_id), so looking up a CP code is a single
+    primary-key seek however many definitions are indexed. update() replaces the CP codes of one
+    definition, so refetching a definition whose targets changed leaves no stale entries behind, and
+    retain() drops the definitions a complete listing no longer contains.
+    """
+
+    def __init__(self, path=DEFAULT_CPCODE_INDEX):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cpcode_alerts ("
+            " account TEXT NOT NULL, cpcode TEXT NOT NULL, definition_id TEXT NOT NULL,"
+            " PRIMARY KEY (account, cpcode, definition_id)) WITHOUT ROWID")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cpcode_alerts_definition ON cpcode_alerts (account, definition_id)")
+        self._conn.commit()
+
+    def update(self, account, definition_id, cpcodes):
+        """Records that definition_id watches exactly these CP codes."""
+        account, definition_id = account or '', str(definition_id)
+        with self._lock:
+            self._conn.execute("DELETE FROM cpcode_alerts WHERE account=? AND definition_id=?", (account, definition_id))
+            self._conn.executemany("INSERT OR IGNORE INTO cpcode_alerts VALUES (?, ?, ?)",
+                                   [(account, str(cpcode), definition_id) for cpcode in cpcodes])
+            self._pending += 1
+            if self._pending >= _COMMIT_EVERY:
+                self._conn.commit()
+                self._pending = 0
+
+    def retain(self, account, definition_ids):
+        """Deletes the entries of every definition not in definition_ids (a complete listing); returns how many went."""
+        account = account or ''
+        with self._lock:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS listed (definition_id TEXT PRIMARY KEY)")
+            self._conn.execute("DELETE FROM listed")
+            self._conn.executemany("INSERT OR IGNORE INTO listed VALUES (?)",
+                                   ((str(definition_id),) for definition_id in definition_ids))
+            removed = self._conn.execute(
+                "DELETE FROM cpcode_alerts WHERE account=? AND definition_id NOT IN (SELECT definition_id FROM listed)",
+                (account,)).rowcount
+            self._conn.execute("DELETE FROM listed")
+            self._conn.commit()
+            self._pending = 0
+            return removed
+
+    def definitions_for(self, account, cpcode):
+        """Returns the definitionIds of the alerts that watch cpcode."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT definition_id FROM cpcode_alerts WHERE account=? AND cpcode=?", (account or '', str(cpcode)))]
+
+    def is_monitored(self, account, cpcode):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM cpcode_alerts WHERE account=? AND cpcode=? LIMIT 1",
+                                      (account or '', str(cpcode))).fetchone() is not None
+
+    def unmonitored(self, account, cpcodes):
+        """Yields the CP codes from an inventory iterable that no indexed alert watches, in input order."""
+        for cpcode in cpcodes:
+            if not self.is_monitored(account, str(cpcode).strip()):
+                yield cpcode
+
+    def stats(self, account):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(DISTINCT cpcode), COUNT(DISTINCT definition_id) FROM cpcode_alerts WHERE account=?",
+                (account or '',)).fetchone()
+
+    def flush(self):
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,110 @@
+"""Streaming CSV writers for rows whose keys are not known up front."""
+import csv
+import os
+import shutil
+import tempfile
+
+MISSING = '-'
+
+
+class StreamingCsvWriter:
+    """Writes dict rows to a CSV as they arrive; the header is the union of every key seen, in first-seen order.
+
+    Rows are spilled to a temporary body file next to the output. Because columns are only ever
+    appended, a row written before a column existed is a prefix of the final layout and only needs
+    padding when the file is finalized, so memory stays bounded by one row however the schema evolves.
+    Missing and None values are written as `missing`.
+
+    With append=True an existing output keeps its rows and its header is extended rather than
+    mismatched. The output is finalized when the writer is closed, also when the `with` block
+    raises, so an interrupted run still leaves every row written so far. Nothing is written if no
+    rows arrived and there was no existing file.
+    """
+
+    def __init__(self, filename, missing=MISSING, encoding='utf-8', append=False):
+        self.filename = filename
+        self.missing = missing
+        self.encoding = encoding
+        self.columns = []
+        self.rows = 0
+        self._index = {}
+        self._widened = False
+        self._existing = 0
+        directory = os.path.dirname(os.path.abspath(filename))
+        self._body = tempfile.NamedTemporaryFile(mode='w+', newline='', encoding=encoding, dir=directory,
+                                                 prefix='.csvsink-', suffix='.tmp', delete=False)
+        self._writer = csv.writer(self._body)
+        if append and os.path.isfile(filename):
+            self._load_existing()
+
+    def _load_existing(self):
+        with open(self.filename, mode='r', newline='', encoding=self.encoding) as infile:
+            reader = csv.reader(infile)
+            header = next(reader, None)
+            if not header:
+                return
+            for key in header:
+                self._index[key] = len(self.columns)
+                self.columns.append(key)
+            for values in reader:
+                self._writer.writerow(values)
+                self._existing += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def writerow(self, row):
+        for key in row:
+            if key not in self._index:
+                if self.rows or self._existing:
+                    self._widened = True
+                self._index[key] = len(self.columns)
+                self.columns.append(key)
+        values = [self.missing] * len(self.columns)
+        for key, value in row.items():
+            values[self._index[key]] = self.missing if value is None else value
+        self._writer.writerow(values)
+        self.rows += 1
+
+    def writerows(self, rows):
+        for row in rows:
+            self.writerow(row)
+
+    def close(self):
+        """Writes the final CSV (header plus padded rows) and removes the temporary body file."""
+        if self._body.closed:
+            return
+        if not self.rows and not self._existing:
+            self.discard()
+            return
+        self._body.flush()
+        self._body.seek(0)
+        width = len(self.columns)
+        partial = self.filename + '.partial'
+        with open(partial, mode='w', newline='', encoding=self.encoding) as outfile:
+            writer = csv.writer(outfile)
+            writer.writerow(self.columns)
+            if self._widened:
+                for values in csv.reader(self._body):
+                    writer.writerow(values + [self.missing] * (width - len(values)))
+            else:
+                shutil.copyfileobj(self._body, outfile)
+        os.replace(partial, self.filename)
+        self.discard()
+
+    def discard(self):
+        """Drops the temporary body file without writing the output."""
+        if not self._body.closed:
+            self._body.close()
+        if os.path.exists(self._body.name):
+            os.remove(self._body.name)
+
+
+def write_rows_to_csv(rows, filename, missing=MISSING, append=False):
+    """Streams an iterable of dict rows into filename; returns the number of rows written."""
+    with StreamingCsvWriter(filename, missing=missing, append=append) as writer:
+        writer.writerows(rows)
+    return writer.rows
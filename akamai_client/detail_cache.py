@@ -0,0 +1,103 @@
+"""Persistent, size-bounded LRU cache of alert detail payloads."""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_DETAIL_CACHE = os.path.join(".cache", "alert_details.sqlite3")
+DEFAULT_DETAIL_CACHE_SIZE = 50000
+
+# Writes are committed in batches; the cache is only an optimisation, so a crash may lose the last few.
+_COMMIT_EVERY = 100
+
+
+class DetailCache:
+    """SQLite-backed cache of alert details keyed by (accountSwitchKey, definitionId, lastTriggered).
+
+    One entry is kept per definition: a payload is only served while the alert's lastTriggered is
+    unchanged, and storing a newer trigger replaces it. get() can also be given a max_age for payloads
+    whose key never changes (alerts that never triggered). When more than max_entries are stored, the
+    least recently used ones are evicted. hits and misses count lookups since the cache was opened.
+    """
+
+    def __init__(self, path=DEFAULT_DETAIL_CACHE, max_entries=DEFAULT_DETAIL_CACHE_SIZE, clock=time.time):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS alert_details ("
+            " account TEXT NOT NULL, definition_id TEXT NOT NULL, last_triggered TEXT NOT NULL,"
+            " payload TEXT NOT NULL, used_at REAL NOT NULL, fetched_at REAL NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (account, definition_id))")
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(alert_details)")]
+        if 'fetched_at' not in columns:
+            # Entries from before fetch times were stored count as fetched long ago.
+            self._conn.execute("ALTER TABLE alert_details ADD COLUMN fetched_at REAL NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS alert_details_used_at ON alert_details (used_at)")
+        self._conn.commit()
+
+    def _changed(self):
+        self._pending += 1
+        if self._pending >= _COMMIT_EVERY:
+            self._evict()
+            self._conn.commit()
+            self._pending = 0
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM alert_details").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM alert_details WHERE rowid IN"
+                " (SELECT rowid FROM alert_details ORDER BY used_at LIMIT ?)", (count - self.max_entries,))
+
+    def get(self, account, definition_id, last_triggered, max_age=None):
+        """Returns the cached details if they were fetched for this exact lastTriggered (within max_age seconds)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, fetched_at FROM alert_details"
+                " WHERE account=? AND definition_id=? AND last_triggered=?",
+                (account or '', str(definition_id), str(last_triggered))).fetchone()
+            if row is None or (max_age is not None and self._clock() - row[1] > max_age):
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE alert_details SET used_at=? WHERE account=? AND definition_id=?",
+                               (self._clock(), account or '', str(definition_id)))
+            self._changed()
+        return json.loads(row[0])
+
+    def put(self, account, definition_id, last_triggered, details):
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO alert_details VALUES (?, ?, ?, ?, ?, ?)",
+                (account or '', str(definition_id), str(last_triggered), json.dumps(details), now, now))
+            self._changed()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_ratio': self.hits / lookups if lookups else 0.0}
+
+    def report(self):
+        stats = self.stats()
+        print(f"Detail cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_ratio']:.0%} hit ratio)")
+
+    def flush(self):
+        with self._lock:
+            self._evict()
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
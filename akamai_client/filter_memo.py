@@ -0,0 +1,62 @@
+"""Persisted memo of which report request shape (filtered or unfiltered) works for each CP code."""
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_FILTER_MEMO = os.path.join(".cache", "filter_memo.sqlite3")
+DEFAULT_FILTER_MEMO_TTL = 7 * 24 * 3600
+
+FILTERED = 'filtered'
+UNFILTERED = 'unfiltered'
+
+
+class FilterMemo:
+    """SQLite-backed (account, cpcode) -> request shape memo whose entries expire after ttl seconds.
+
+    `avoided` counts the requests saved by routing a CP code straight to the shape that worked.
+    """
+
+    def __init__(self, path=DEFAULT_FILTER_MEMO, ttl=DEFAULT_FILTER_MEMO_TTL, clock=time.time):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.avoided = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS filter_memo ("
+            " account TEXT NOT NULL, cpcode TEXT NOT NULL, shape TEXT NOT NULL, recorded_at REAL NOT NULL,"
+            " PRIMARY KEY (account, cpcode))")
+        self._conn.commit()
+
+    def get(self, account, cpcode):
+        """Returns FILTERED, UNFILTERED or None when nothing fresh is known."""
+        with self._lock:
+            row = self._conn.execute("SELECT shape, recorded_at FROM filter_memo WHERE account=? AND cpcode=?",
+                                     (account, str(cpcode))).fetchone()
+        if row is None or self._clock() - row[1] > self.ttl:
+            return None
+        return row[0]
+
+    def set(self, account, cpcode, shape):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO filter_memo VALUES (?, ?, ?, ?)",
+                               (account, str(cpcode), shape, self._clock()))
+            self._conn.commit()
+
+    def record_avoided(self, count=1):
+        with self._lock:
+            self.avoided += count
+
+    def purge_expired(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM filter_memo WHERE recorded_at < ?", (self._clock() - self.ttl,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,60 @@
+"""Flattener that turns nested JSON records into typed, flat rows."""
+import json
+
+JSON = 'json'
+SCALAR_TYPES = {str: 'str', int: 'int', float: 'float', bool: 'bool', type(None): 'null'}
+
+_encode = json.JSONEncoder(separators=(',', ':')).encode
+
+
+class Flattener:
+    """Flattens nested dicts into one level: nested scalars become dotted columns, arrays become JSON text.
+
+    Records are walked recursively in key order, so columns come out depth first. Column names are
+    built once per (parent column, key) and reused, and the schema is only touched when a column
+    arrives with a different type than it had last time. Scalars keep their Python type; `schema`
+    maps every column produced so far to its type ('str', 'int', 'float', 'bool', 'null' or 'json'),
+    widening int to float and conflicting types to str, for typed columnar sinks.
+    """
+
+    def __init__(self, prefix='', sep='.'):
+        self.prefix = prefix
+        self.sep = sep
+        self.schema = {}
+        self._columns = {}
+        self._kinds = {}
+
+    def _update_schema(self, column, kind):
+        self._kinds[column] = kind
+        known = self.schema.get(column)
+        if known is None or known == 'null':
+            self.schema[column] = kind
+        elif kind != known and kind != 'null':
+            self.schema[column] = 'float' if {known, kind} == {'int', 'float'} else 'str'
+
+    def _flatten(self, value, parent, out):
+        columns = self._columns.get(parent)
+        if columns is None:
+            columns = self._columns[parent] = {}
+        kinds = self._kinds
+        for key, item in value.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = f"{self.prefix}{key}" if parent is None else f"{parent}{self.sep}{key}"
+            kind = SCALAR_TYPES.get(type(item))
+            if kind is None:
+                if isinstance(item, dict) and item:
+                    self._flatten(item, column, out)
+                    continue
+                kind = JSON
+                item = _encode(item)
+            out[column] = item
+            if kinds.get(column) is not kind:
+                self._update_schema(column, kind)
+
+    def flatten(self, record, out=None):
+        """Returns out (a new dict by default) updated with the flattened columns of record."""
+        if out is None:
+            out = {}
+        self._flatten(record, None, out)
+        return out
@@ -0,0 +1,107 @@
+"""Incremental decoding of large JSON API responses."""
+import codecs
+import json
+
+_WHITESPACE = ' \t\n\r'
+_NUMBER_START = '-0123456789'
+_NUMBER_CHARS = '0123456789+-.eE'
+_COMPACT_AT = 1 << 16
+
+
+class _StreamBuffer:
+    """Text window over an iterator of byte chunks that is refilled on demand and trimmed as it is consumed."""
+
+    def __init__(self, chunks, encoding='utf-8'):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._json = json.JSONDecoder()
+        self.text = ''
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self):
+        """Appends the next chunk; returns False once the stream is exhausted."""
+        if self.pos >= _COMPACT_AT:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            self.text += self._decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+            return True
+        if not self.exhausted:
+            self.text += self._decoder.decode(b'', final=True)
+            self.exhausted = True
+        return False
+
+    def peek(self):
+        """Returns the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} of JSON stream, found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decodes and consumes one complete JSON value, reading more of the stream as needed."""
+        self.peek()
+        while True:
+            if self.text[self.pos] in _NUMBER_START and not self.exhausted:
+                # A number running to the end of the buffer may continue in the next chunk ("12." + "5"),
+                # and raw_decode would return its prefix; read on until something follows it.
+                end = self.pos
+                while end < len(self.text) and self.text[end] in _NUMBER_CHARS:
+                    end += 1
+                if end == len(self.text):
+                    self.fill()
+                    continue
+            try:
+                obj, end = self._json.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            self.pos = end
+            return obj
+
+
+def iter_json_array(chunks, key):
+    """Yields the elements of the array stored under `key` of a top-level JSON object, one at a time.
+
+    chunks is any iterable of bytes or str (e.g. response.iter_content()). Only one element and one
+    chunk are held in memory at a time; other top-level members are decoded and discarded.
+    """
+    buffer = _StreamBuffer(chunks)
+    buffer.expect('{')
+    if buffer.peek() == '}':
+        return
+    while True:
+        name = buffer.value()
+        buffer.expect(':')
+        if name == key:
+            buffer.expect('[')
+            if buffer.peek() == ']':
+                buffer.pos += 1
+            else:
+                while True:
+                    yield buffer.value()
+                    if buffer.peek() == ',':
+                        buffer.pos += 1
+                        continue
+                    buffer.expect(']')
+                    break
+        else:
+            buffer.value()
+        if buffer.peek() == ',':
+            buffer.pos += 1
+            continue
+        buffer.expect('}')
+        return
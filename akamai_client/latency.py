@@ -0,0 +1,254 @@
+"""Per-request latency breakdown (connect, TLS, time to first byte, download, JSON decode).
+
+Every request sent through a LatencyAdapter is timed phase by phase and tagged with its endpoint,
+its account (the accountSwitchKey parameter, else the host) and its source: live traffic, or a
+response replayed from a cassette, whose timings say nothing about the network. Timings are kept in
+log-bucketed histograms, and the process-wide recorder writes a p50/p95/p99 summary CSV when the run
+exits and prints a single line pointing to it; set AKAMAI_LATENCY_SUMMARY to change its path, or to
+an empty string to disable it.
+"""
+import atexit
+import csv
+import math
+import os
+import threading
+import time
+from collections import Counter
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .transport import endpoint_key
+
+LATENCY_SUMMARY_ENV = 'AKAMAI_LATENCY_SUMMARY'
+DEFAULT_LATENCY_SUMMARY = os.path.join(".cache", "latency_summary.csv")
+
+CONNECT = 'connect'
+TLS = 'tls'
+TTFB = 'ttfb'
+DOWNLOAD = 'download'
+DECODE = 'decode'
+PHASES = (CONNECT, TLS, TTFB, DOWNLOAD, DECODE)
+PERCENTILES = (50, 95, 99)
+
+LIVE = 'live'
+REPLAYED = 'replayed'
+
+# Bucket bounds grow by 5% from 1 µs, so a reported percentile is within 5% of the true value.
+_BUCKET_MIN = 1e-6
+_BUCKET_GROWTH = 1.05
+_LOG_GROWTH = math.log(_BUCKET_GROWTH)
+
+# The timing of the request being sent on this thread; connections are opened on the sending thread.
+_current = threading.local()
+_lock = threading.Lock()
+_recorder = None
+
+
+def account_tag(url):
+    """Returns the account a request is made for: its accountSwitchKey parameter, else its host."""
+    parts = urlsplit(url)
+    keys = parse_qs(parts.query).get('accountSwitchKey')
+    return keys[0] if keys else parts.hostname or ''
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram of durations in seconds; memory is bounded however many are added."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._buckets = Counter()
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        bucket = math.ceil(math.log(seconds / _BUCKET_MIN) / _LOG_GROWTH) if seconds > _BUCKET_MIN else 0
+        self._buckets[bucket] += 1
+
+    def percentile(self, percent):
+        """Returns the upper bound of the bucket holding the given percentile (capped at the maximum)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= rank:
+                return min(_BUCKET_MIN * _BUCKET_GROWTH ** bucket, self.max)
+        return self.max
+
+
+class LatencyRecorder:
+    """Thread-safe histograms of phase durations per (endpoint, account, source, phase)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def record(self, endpoint, account, phase, seconds, source=LIVE):
+        key = (endpoint, account, source, phase)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.add(seconds)
+
+    def summary(self):
+        """Returns rows of count, mean, max and percentiles (in milliseconds) per endpoint, account, source and phase."""
+        with self._lock:
+            items = sorted(self._histograms.items(),
+                           key=lambda item: (item[0][0], item[0][1], item[0][2], PHASES.index(item[0][3])))
+            rows = []
+            for (endpoint, account, source, phase), histogram in items:
+                row = {'endpoint': endpoint, 'account': account, 'source': source, 'phase': phase,
+                       'count': histogram.count, 'mean_ms': round(histogram.total / histogram.count * 1000, 3)}
+                for percent in PERCENTILES:
+                    row[f'p{percent}_ms'] = round(histogram.percentile(percent) * 1000, 3)
+                row['max_ms'] = round(histogram.max * 1000, 3)
+                rows.append(row)
+            return rows
+
+    def write_summary(self, filename):
+        """Writes summary() to a CSV and prints where it went; returns the filename, or None if nothing was timed."""
+        rows = self.summary()
+        if not rows:
+            return None
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(filename, mode='w', newline='', encoding='utf-8') as outfile:
+            writer = csv.DictWriter(outfile, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        endpoints = {row['endpoint'] for row in rows}
+        print(f"Latency summary of {len(endpoints)} endpoints written to {filename}")
+        return filename
+
+
+def latency_recorder():
+    """Returns the process-wide LatencyRecorder; its summary is written at exit (see LATENCY_SUMMARY_ENV)."""
+    global _recorder
+    with _lock:
+        if _recorder is None:
+            _recorder = LatencyRecorder()
+            filename = os.environ.get(LATENCY_SUMMARY_ENV, DEFAULT_LATENCY_SUMMARY)
+            if filename:
+                atexit.register(_recorder.write_summary, filename)
+        return _recorder
+
+
+class RequestTiming:
+    """Phase timings of one request, recorded as they are measured."""
+
+    def __init__(self, recorder, url, source=LIVE):
+        self.recorder = recorder
+        self.endpoint = endpoint_key(url)
+        self.account = account_tag(url)
+        self.source = source
+        self.connecting = 0.0
+
+    def add(self, phase, seconds):
+        if phase in (CONNECT, TLS):
+            self.connecting += seconds
+        self.recorder.record(self.endpoint, self.account, phase, seconds, self.source)
+
+
+class TimedResponse(requests.Response):
+    """Response whose json() records its decode time with the request's other phases."""
+
+    timing = None
+
+    def json(self, **kwargs):
+        if self.timing is None:
+            return super().json(**kwargs)
+        start = time.perf_counter()
+        data = super().json(**kwargs)
+        self.timing.add(DECODE, time.perf_counter() - start)
+        return data
+
+
+def _add_current(phase, seconds):
+    timing = getattr(_current, 'timing', None)
+    if timing is not None:
+        timing.add(phase, seconds)
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """Connection that reports how long opening its TCP socket took."""
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        sock = super()._new_conn()
+        _add_current(CONNECT, time.perf_counter() - start)
+        return sock
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    """Connection that reports its TCP connect and TLS handshake times separately."""
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        sock = super()._new_conn()
+        self._tcp_seconds = time.perf_counter() - start
+        _add_current(CONNECT, self._tcp_seconds)
+        return sock
+
+    def connect(self):
+        self._tcp_seconds = 0.0
+        start = time.perf_counter()
+        super().connect()
+        _add_current(TLS, time.perf_counter() - start - self._tcp_seconds)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class LatencyAdapter(HTTPAdapter):
+    """Transport adapter that times each request phase into a LatencyRecorder.
+
+    connect and tls are only recorded when a new connection is opened, since reused keep-alive
+    connections skip them; ttfb covers sending the request until the response headers arrive.
+    Non-streamed bodies are read here so the download is timed apart from the wait. Streamed
+    responses are parsed while they download, so neither their download nor decode is recorded.
+    """
+
+    def __init__(self, recorder=None, **kwargs):
+        self.recorder = recorder or latency_recorder()
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': TimedHTTPConnectionPool,
+                                                   'https': TimedHTTPSConnectionPool}
+
+    def build_response(self, req, resp):
+        response = super().build_response(req, resp)
+        response.__class__ = TimedResponse
+        return response
+
+    def send(self, request, stream=False, **kwargs):
+        timing = RequestTiming(self.recorder, request.url)
+        _current.timing = timing
+        start = time.perf_counter()
+        try:
+            response = super().send(request, stream=stream, **kwargs)
+        finally:
+            _current.timing = None
+        timing.add(TTFB, time.perf_counter() - start - timing.connecting)
+        if not stream:
+            start = time.perf_counter()
+            response.content  # Read the body here so the download is timed apart from the wait
+            timing.add(DOWNLOAD, time.perf_counter() - start)
+        response.timing = timing
+        return response
@@ -0,0 +1,297 @@
+"""Local stand-in for the Akamai APIs used by the step scripts, for offline load testing.
+
+Run it and point the scripts at it through the host override::
+
+    python -m akamai_client.mockserver --port 8080 --alerts 5000 --cpcodes 20000 --latency 0.05
+    AKAMAI_HOST_OVERRIDE=http://127.0.0.1:8080 python "Alerts Details (Step 2).py"
+
+Data is synthetic and deterministic for a given seed; latency, error rate and the
+server-side rate limit are injectable so transport changes can be benchmarked reproducibly.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+ALERT_DETAILS_PATH = re.compile(r'^/alerts/v2/alert-summaries/(\d+)/details$')
+REPORT_PATH = '/reporting-api/v1/reports/hits-by-cpcode/versions/1/report-data'
+FIRST_DEFINITION_ID = 100000
+FIRST_CPCODE = 500000
+TEMPLATES = ['CP Code Traffic', 'Origin Errors', 'Edge Errors', 'Offload Drop']
+
+
+class MockAkamaiData:
+    """Deterministic synthetic alerts, alert definitions, CP codes and traffic rows."""
+
+    def __init__(self, alerts=1000, cpcodes=1000, triggered_ratio=0.5, dormant_ratio=0.1, seed=0):
+        self.alerts = alerts
+        self.cpcodes = cpcodes
+        self.triggered_ratio = triggered_ratio
+        self.dormant_ratio = dormant_ratio
+        self.seed = seed
+
+    def _rng(self, *key):
+        return random.Random(f"{self.seed}:{':'.join(map(str, key))}")
+
+    def cpcode_ids(self):
+        return range(FIRST_CPCODE, FIRST_CPCODE + self.cpcodes)
+
+    def alert_summary(self, index):
+        rng = self._rng('alert', index)
+        definition_id = FIRST_DEFINITION_ID + index
+        summary = {
+            'definitionId': definition_id,
+            'name': f"Alert {definition_id}",
+            'templateName': rng.choice(TEMPLATES),
+            'createdBy': f"user{rng.randrange(50)}@example.com",
+        }
+        if rng.random() < self.triggered_ratio:
+            triggered = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=rng.randrange(500000))
+            summary['lastTriggered'] = triggered.strftime('%Y-%m-%dT%H:%M:%SZ')
+        return summary
+
+    def alert_summaries(self):
+        return {'data': [self.alert_summary(index) for index in range(self.alerts)]}
+
+    def alert_definition(self, definition_id):
+        index = definition_id - FIRST_DEFINITION_ID
+        if not 0 <= index < self.alerts:
+            return None
+        rng = self._rng('definition', definition_id)
+        cpcodes = sorted(rng.sample(self.cpcode_ids(), min(self.cpcodes, rng.randint(1, 5))))
+        return {'definition': {
+            'definitionId': definition_id,
+            'name': f"Alert {definition_id}",
+            'templateId': rng.randrange(1, 40),
+            'isEnabled': rng.random() < 0.9,
+            'emails': [f"oncall{rng.randrange(20)}@example.com" for _ in range(rng.randint(1, 3))],
+            'fieldMap': {
+                'cpcodes': [str(cpcode) for cpcode in cpcodes],
+                'threshold': rng.choice([50, 75, 90]),
+                'window': rng.choice([5, 15, 30]),
+                'comparison': rng.choice(['above', 'below']),
+            },
+            'notifications': {'sendEmail': True, 'frequency': rng.choice(['ONCE', 'HOURLY'])},
+        }}
+
+    def cpcode(self, cpcode_id):
+        rng = self._rng('cpcode', cpcode_id)
+        contract_id = f"C-{rng.randrange(16 ** 6):06X}"
+        return {
+            'cpcodeId': str(cpcode_id),
+            'cpcodeName': f"property-{cpcode_id}.example.com",
+            'purgeable': rng.random() < 0.8,
+            'accountId': 'act_MOCK',
+            'defaultTimezone': 'GMT 0 (Greenwich Mean Time)',
+            'overrideTimezone': {'timezoneId': '0', 'timezoneValue': 'GMT 0 (Greenwich Mean Time)'},
+            'type': 'Regular',
+            'contracts': [{'contractId': contract_id, 'status': rng.choice(['ongoing', 'expired'])}],
+            'products': [{'productId': f"prd::{rng.choice(['Web_App_Accel', 'Download_Delivery', 'Adaptive_Media_Delivery'])}",
+                          'productName': 'Product'}],
+            'accessGroup': {'groupId': rng.randrange(10000, 99999), 'contractId': contract_id},
+        }
+
+    def is_dormant(self, cpcode_id):
+        return self._rng('dormant', cpcode_id).random() < self.dormant_ratio
+
+    def report_rows(self, object_ids, start, end, interval, filtered):
+        rows = []
+        for cpcode in object_ids:
+            if filtered and self.is_dormant(cpcode):
+                continue
+            if interval:
+                day = start
+                while day < end:
+                    rows.append(self._report_row(cpcode, day))
+                    day += timedelta(days=1)
+            else:
+                rows.append(self._report_row(cpcode, start))
+        return rows
+
+    def _report_row(self, cpcode, day):
+        rng = self._rng('report', cpcode, day.date())
+        edge_hits = rng.randrange(1000, 10 ** 7)
+        return {
+            'cpcode': str(cpcode),
+            'startdatetime': day.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'edgeHits': edge_hits,
+            'hitsOffload': round(rng.uniform(50, 100), 2),
+        }
+
+
+class ServerRateLimit:
+    """Akamai-style token bucket that fills the X-RateLimit-* headers and answers 429 when empty."""
+
+    def __init__(self, limit, per_second):
+        self.limit = limit
+        self.per_second = per_second
+        self.tokens = float(limit)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        """Returns (allowed, remaining, seconds until the next token)."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(float(self.limit), self.tokens + (now - self.updated) * self.per_second)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True, int(self.tokens), 0.0
+            return False, 0, (1 - self.tokens) / self.per_second
+
+
+class MockAkamaiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, data, latency=0.0, latency_jitter=0.0, error_rate=0.0, rate_limit=None,
+                 rate_per_second=None, seed=0):
+        super().__init__(address, MockAkamaiHandler)
+        self.data = data
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.rate_limit = ServerRateLimit(rate_limit, rate_per_second or rate_limit) if rate_limit else None
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.requests = 0
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def random(self):
+        with self.rng_lock:
+            self.requests += 1
+            return self.rng.random()
+
+
+class MockAkamaiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        roll = server.random()
+        if server.latency or server.latency_jitter:
+            time.sleep(server.latency + roll * server.latency_jitter)
+
+        headers = {}
+        if server.rate_limit:
+            allowed, remaining, wait = server.rate_limit.take()
+            headers['X-RateLimit-Limit'] = str(server.rate_limit.limit)
+            headers['X-RateLimit-Remaining'] = str(remaining)
+            if not allowed:
+                headers['Retry-After'] = f"{wait:.3f}"
+                return self._send_json(429, {'title': 'Too Many Requests'}, headers)
+
+        if roll < server.error_rate:
+            status = (500, 502, 503, 504)[int(roll * 1000) % 4]
+            return self._send_json(status, {'title': 'Injected error'}, headers)
+
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        match = ALERT_DETAILS_PATH.match(url.path)
+        if url.path == '/alerts/v2/alert-summaries':
+            return self._send_json(200, server.data.alert_summaries(), headers)
+        if match:
+            details = server.data.alert_definition(int(match.group(1)))
+            if details is None:
+                return self._send_json(404, {'title': 'Not Found'}, headers)
+            return self._send_json(200, details, headers)
+        if url.path == '/cprg/v1/cpcodes':
+            return self._send_cpcodes(headers)
+        if url.path == REPORT_PATH:
+            return self._send_report(params, headers)
+        return self._send_json(404, {'title': 'Not Found'}, headers)
+
+    def _send_report(self, params, headers):
+        try:
+            start = datetime.fromisoformat(params['start'][0])
+            end = datetime.fromisoformat(params['end'][0])
+            object_ids = [int(cpcode) for cpcode in params['objectIds'][0].split(',') if cpcode]
+        except (KeyError, ValueError):
+            return self._send_json(400, {'title': 'Bad Request'}, headers)
+        rows = self.server.data.report_rows(object_ids, start, end, params.get('interval', [None])[0],
+                                            'filters' in params)
+        return self._send_json(200, {'data': rows, 'metadata': {'objectIds': object_ids}}, headers)
+
+    def _send_cpcodes(self, headers):
+        # Chunked so very large synthetic inventories never have to exist in memory at once.
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self._write_chunk(b'{"cpcodes": [')
+        for index, cpcode_id in enumerate(self.server.data.cpcode_ids()):
+            prefix = b',' if index else b''
+            self._write_chunk(prefix + json.dumps(self.server.data.cpcode(cpcode_id)).encode())
+        self._write_chunk(b']}')
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _write_chunk(self, payload):
+        self.wfile.write(f"{len(payload):X}\r\n".encode() + payload + b'\r\n')
+
+    def _send_json(self, status, body, headers):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def start_mock_server(host='127.0.0.1', port=0, alerts=1000, cpcodes=1000, triggered_ratio=0.5, dormant_ratio=0.1,
+                      latency=0.0, latency_jitter=0.0, error_rate=0.0, rate_limit=None, rate_per_second=None, seed=0):
+    """Starts a mock server on a background thread and returns it; call shutdown() when done."""
+    data = MockAkamaiData(alerts, cpcodes, triggered_ratio, dormant_ratio, seed)
+    server = MockAkamaiServer((host, port), data, latency, latency_jitter, error_rate, rate_limit,
+                              rate_per_second, seed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic Akamai API data for offline load testing.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--alerts', type=int, default=1000, help="number of alert definitions")
+    parser.add_argument('--cpcodes', type=int, default=1000, help="number of CP codes")
+    parser.add_argument('--triggered-ratio', type=float, default=0.5, help="share of alerts with lastTriggered")
+    parser.add_argument('--dormant-ratio', type=float, default=0.1,
+                        help="share of CP codes with no data when report filters are applied")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--latency-jitter', type=float, default=0.0, help="up to this many extra random seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of requests answered with a 5xx")
+    parser.add_argument('--rate-limit', type=int, default=None, help="server-side token bucket size")
+    parser.add_argument('--rate-per-second', type=float, default=None, help="bucket refill rate (default: size)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    data = MockAkamaiData(args.alerts, args.cpcodes, args.triggered_ratio, args.dormant_ratio, args.seed)
+    server = MockAkamaiServer((args.host, args.port), data, args.latency, args.latency_jitter, args.error_rate,
+                              args.rate_limit, args.rate_per_second, args.seed)
+    print(f"Mock Akamai API listening on {server.base_url}")
+    print(f"Point the scripts at it with: export AKAMAI_HOST_OVERRIDE={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Adaptive token-bucket rate limiter fed by Akamai rate-limit response headers."""
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+DEFAULT_RATE = 5.0
+DEFAULT_BURST = 10
+DEFAULT_MIN_RATE = 0.5
+DEFAULT_MAX_RATE = 50.0
+
+# Fraction of the server-side bucket below which we back off, and above which we speed up.
+LOW_WATERMARK = 0.1
+HIGH_WATERMARK = 0.5
+
+
+def _header(headers, *names):
+    for name in names:
+        value = headers.get(name)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_retry_after(value, now=None):
+    """Returns the number of seconds to wait from a Retry-After value (delta-seconds or HTTP date)."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:  # "-0000" and zone-less dates parse naive; HTTP dates are GMT
+        when = when.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+
+def parse_next_token(value, now=None):
+    """Returns the number of seconds until the ISO-8601 X-RateLimit-Next timestamp."""
+    if value is None:
+        return None
+    try:
+        when = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+
+class AdaptiveRateLimiter:
+    """Token bucket whose refill rate follows the quota the API reports back.
+
+    The rate grows additively while the server-side bucket stays comfortably full and is
+    halved when it runs low or a 429 comes back. Retry-After / X-RateLimit-Next pause
+    every caller until the server is ready again.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, min_rate=DEFAULT_MIN_RATE,
+                 max_rate=DEFAULT_MAX_RATE, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate)
+        self.tokens = float(self.burst)
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = max(0.0, now - self._updated)
+        self.tokens = min(float(self.burst), self.tokens + elapsed * self.rate)
+        self._updated = now
+
+    def reserve(self):
+        """Takes a token and returns 0 if a request may be sent now, else returns the seconds to wait first."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return 0.0
+            return (1.0 - self.tokens) / self.rate
+
+    def acquire(self):
+        """Blocks until a request may be sent."""
+        while True:
+            wait = self.reserve()
+            if not wait:
+                return
+            self._sleep(wait)
+
+    def pause(self, seconds):
+        """Stops handing out tokens for the given number of seconds."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, self._clock() + seconds)
+
+    def update(self, status_code, headers):
+        """Adjusts the rate from a response's status code and rate-limit headers."""
+        limit = _to_int(_header(headers, 'X-RateLimit-Limit', 'Akamai-RateLimit-Limit'))
+        remaining = _to_int(_header(headers, 'X-RateLimit-Remaining', 'Akamai-RateLimit-Remaining'))
+        retry_after = parse_retry_after(_header(headers, 'Retry-After'))
+        if retry_after is None and (status_code == 429 or remaining == 0):
+            retry_after = parse_next_token(_header(headers, 'X-RateLimit-Next', 'Akamai-RateLimit-Next'))
+
+        with self._lock:
+            self._refill(self._clock())
+            if limit:
+                self.burst = limit
+            if remaining is not None:
+                # The server's bucket is authoritative; never hold more tokens than it has left.
+                self.tokens = min(self.tokens, float(remaining))
+
+            if status_code == 429:
+                self.throttled += 1
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.tokens = 0.0
+            elif limit and remaining is not None:
+                if remaining <= limit * LOW_WATERMARK:
+                    self.rate = max(self.min_rate, self.rate / 2)
+                elif remaining >= limit * HIGH_WATERMARK:
+                    self.rate = min(self.max_rate, self.rate + 1.0)
+
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, self._clock() + retry_after)
+
+
+class UnlimitedRateLimiter:
+    """Rate limiter that never waits and ignores rate-limit headers; used to replay recorded traffic at full speed."""
+
+    throttled = 0
+
+    def reserve(self):
+        return 0.0
+
+    def acquire(self):
+        pass
+
+    def pause(self, seconds):
+        pass
+
+    def update(self, status_code, headers):
+        pass
@@ -0,0 +1,68 @@
+"""On-disk cache of reporting data for closed (immutable) report windows."""
+import json
+import os
+import sqlite3
+import threading
+
+DEFAULT_REPORT_CACHE = os.path.join(".cache", "traffic_reports.sqlite3")
+
+
+class ReportIntervalCache:
+    """SQLite-backed store of report rows keyed by (account, cpcode, metrics, filters, interval start and end).
+
+    The interval end is part of the key, so a shorter interval is never read back as a longer
+    one that starts at the same time. An empty row list is a valid entry: it records that the
+    interval had no traffic, which is just as final as a populated one.
+    """
+
+    def __init__(self, path=DEFAULT_REPORT_CACHE):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(report_intervals)")]
+        if columns and 'interval_end' not in columns:
+            # Entries from before interval ends were keyed cannot be told apart; drop them.
+            self._conn.execute("DROP TABLE report_intervals")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS report_intervals ("
+            " account TEXT NOT NULL, cpcode TEXT NOT NULL, metrics TEXT NOT NULL, filters TEXT NOT NULL,"
+            " interval_start TEXT NOT NULL, interval_end TEXT NOT NULL, rows TEXT NOT NULL,"
+            " PRIMARY KEY (account, cpcode, metrics, filters, interval_start, interval_end))")
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, account, cpcode, metrics, filters, interval_start, interval_end):
+        """Returns the cached rows for an interval, or None if it was never stored."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT rows FROM report_intervals WHERE account=? AND cpcode=? AND metrics=? AND filters=?"
+                " AND interval_start=? AND interval_end=?",
+                (account, str(cpcode), metrics, filters, interval_start, interval_end)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, account, cpcode, metrics, filters, interval_start, interval_end, rows):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO report_intervals VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (account, str(cpcode), metrics, filters, interval_start, interval_end, json.dumps(rows)))
+            self._conn.commit()
+
+    def purge_before(self, interval_start):
+        """Deletes the intervals that start before interval_start; returns how many went."""
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM report_intervals WHERE interval_start < ?", (interval_start,)).rowcount
+            self._conn.commit()
+            return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,114 @@
+"""Retry policy, retry budget and per-endpoint retry counters for the shared transport."""
+import random
+import threading
+from collections import defaultdict
+
+import requests
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+# Statuses that mean the server did not process the request, so even a POST may be resent.
+UNPROCESSED_STATUSES = frozenset({429})
+
+
+class RetryPolicy:
+    """Decides whether a failed call is retried and how long to back off before the next attempt.
+
+    Backoff is exponential with full jitter. Non-idempotent methods are only retried when the
+    request provably never reached the API (connect failures and 429s).
+    """
+
+    def __init__(self, max_attempts=4, backoff_base=0.5, backoff_max=30.0, retry_statuses=RETRYABLE_STATUSES,
+                 idempotent_methods=IDEMPOTENT_METHODS, rng=None):
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.idempotent_methods = frozenset(m.upper() for m in idempotent_methods)
+        self._rng = rng or random.Random()
+
+    def is_idempotent(self, method):
+        return method.upper() in self.idempotent_methods
+
+    def retry_on_status(self, method, status_code):
+        if status_code not in self.retry_statuses:
+            return False
+        return self.is_idempotent(method) or status_code in UNPROCESSED_STATUSES
+
+    def retry_on_error(self, method, error):
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                              requests.exceptions.ChunkedEncodingError)):
+            return self.is_idempotent(method)
+        return False
+
+    def backoff(self, attempt):
+        """Returns the jittered delay in seconds before retry number `attempt` (1-based)."""
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return self._rng.uniform(0, ceiling)
+
+
+class RetryBudget:
+    """Caps retries to a fraction of the traffic so an outage does not multiply the load.
+
+    Every request deposits `ratio` tokens and every retry withdraws one; `min_retries`
+    tokens are always available so quiet runs can still recover from a blip.
+    """
+
+    def __init__(self, ratio=0.2, min_retries=10):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.requests = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.requests += 1
+
+    def withdraw(self):
+        with self._lock:
+            if self.retries + 1 > self.min_retries + self.requests * self.ratio:
+                return False
+            self.retries += 1
+            return True
+
+
+class RetryStats:
+    """Thread-safe per-endpoint counters of requests, retries and calls that gave up."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: {'requests': 0, 'retries': 0, 'gave_up': 0, 'budget_exhausted': 0})
+
+    def record(self, endpoint, retries, gave_up=False, budget_exhausted=False):
+        with self._lock:
+            counters = self._counters[endpoint]
+            counters['requests'] += 1
+            counters['retries'] += retries
+            counters['gave_up'] += int(gave_up)
+            counters['budget_exhausted'] += int(budget_exhausted)
+
+    def summary(self):
+        with self._lock:
+            return {endpoint: dict(counters) for endpoint, counters in self._counters.items()}
+
+    def total_retries(self):
+        with self._lock:
+            return sum(counters['retries'] for counters in self._counters.values())
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+    def report(self):
+        """Prints how many retries each endpoint needed during this run."""
+        summary = self.summary()
+        if not any(counters['retries'] for counters in summary.values()):
+            print("No retries were needed.")
+            return
+        for endpoint, counters in sorted(summary.items()):
+            print(f"Retries for {endpoint}: {counters['retries']} over {counters['requests']} requests "
+                  f"({counters['gave_up']} gave up, {counters['budget_exhausted']} over budget)")
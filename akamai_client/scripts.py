@@ -0,0 +1,28 @@
+"""Imports the step scripts, whose file names are not valid module names, as regular modules."""
+import importlib.util
+import os
+import re
+import sys
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ALERTS_LIST = "Alerts List All (Step 1).py"
+ALERTS_DETAILS = "Alerts Details (Step 2).py"
+CPCODES = "Get All CPcodes-Products-Contracts(Step 1).py"
+TRAFFIC = "Traffic Volume per CPcode(Step 2).py"
+
+
+def load_script(filename):
+    """Returns the module for a step script, executing it only the first time it is requested."""
+    name = "akamai_step_" + re.sub(r'\W+', '_', os.path.splitext(filename)[0]).strip('_').lower()
+    module = sys.modules.get(name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPTS_DIR, filename))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[name]
+            raise
+    return module
@@ -0,0 +1,165 @@
+"""Shared EdgeGrid session factory used by every step script."""
+import os
+import threading
+from urllib.parse import urljoin
+
+from akamai.edgegrid import EdgeRc
+
+from .cassette import REPLAY, CassetteAdapter, cassette_from_env
+from .latency import LatencyAdapter
+from .ratelimit import UnlimitedRateLimiter
+from .retry import RetryPolicy
+from .signing import EdgeGridSignerAuth
+from .transport import AkamaiSession
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 32
+
+# Points every script at another API host, e.g. http://127.0.0.1:8080 for the local mock server.
+HOST_OVERRIDE_ENV = 'AKAMAI_HOST_OVERRIDE'
+
+# Set to 1 to sign requests to an overridden host with the real .edgerc credentials (e.g. a staging proxy).
+OVERRIDE_USE_EDGERC_ENV = 'AKAMAI_HOST_OVERRIDE_USE_EDGERC'
+
+# Placeholder credentials used against an overridden host and when replaying a cassette without an .edgerc.
+MOCK_CREDENTIALS = {'client_token': 'mock-client-token', 'client_secret': 'mock-client-secret',
+                    'access_token': 'mock-access-token'}
+
+# Host used when replaying a cassette without an .edgerc or host override; no request reaches it.
+REPLAY_HOST = 'replay.invalid'
+
+# Report generation is slow and busy on Akamai's side, so give it more patience than the rest.
+DEFAULT_RETRY_POLICIES = {
+    '/reporting-api/': RetryPolicy(max_attempts=5, backoff_base=1.0, backoff_max=60.0),
+}
+
+_lock = threading.Lock()
+_credentials = {}
+_sessions = {}
+
+
+def load_credentials(edgerc_path, section='default'):
+    """Returns the credentials of an .edgerc section, parsing each (path, section) only once."""
+    key = (os.path.abspath(os.path.expanduser(edgerc_path)), section)
+    with _lock:
+        credentials = _credentials.get(key)
+        if credentials is None:
+            edgerc = EdgeRc(key[0])
+            credentials = {
+                'host': edgerc.get(section, 'host'),
+                'client_token': edgerc.get(section, 'client_token'),
+                'client_secret': edgerc.get(section, 'client_secret'),
+                'access_token': edgerc.get(section, 'access_token'),
+            }
+            _credentials[key] = credentials
+    return credentials
+
+
+def api_url(hostname, path):
+    """Builds the URL of an API path; hostname may carry its own scheme (e.g. an http:// override)."""
+    base = hostname if '://' in hostname else f'https://{hostname}'
+    return urljoin(base, path)
+
+
+def create_session(credentials, pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                   cassette=None, **transport_options):
+    """Builds a new EdgeGrid-authenticated session with a sized connection pool.
+
+    transport_options are passed to AkamaiSession (rate_limiter, retry_policies, ...). With a Cassette,
+    traffic is recorded to it or replayed from it; full-speed replay also drops throttling and backoff.
+    Request phase timings go to the process-wide LatencyRecorder (see akamai_client.latency).
+    """
+    if cassette is not None and cassette.mode == REPLAY:
+        for name, value in replay_transport_options().items():
+            transport_options.setdefault(name, value)
+    transport_options.setdefault('retry_policies', DEFAULT_RETRY_POLICIES)
+    session = AkamaiSession(**transport_options)
+    if cassette is not None:
+        adapter = CassetteAdapter(cassette, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    else:
+        adapter = LatencyAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.auth = EdgeGridSignerAuth(credentials['client_token'], credentials['client_secret'],
+                                      credentials['access_token'])
+    session.headers.update({"accept": "application/json"})
+    return session
+
+
+def resolve_credentials(edgerc_path, section='default', host_override=None, replaying=False, use_edgerc=None):
+    """Returns (credentials, hostname) for an .edgerc section.
+
+    host_override (default: the AKAMAI_HOST_OVERRIDE environment variable) replaces the .edgerc host.
+    Requests to an overridden host are signed with placeholder credentials, so real secrets never
+    reach a mock or plain-http endpoint, unless use_edgerc (default: AKAMAI_HOST_OVERRIDE_USE_EDGERC=1)
+    opts in. Placeholder credentials are also used when replaying a cassette without a readable .edgerc.
+    """
+    host_override = host_override or os.environ.get(HOST_OVERRIDE_ENV)
+    if use_edgerc is None:
+        use_edgerc = os.environ.get(OVERRIDE_USE_EDGERC_ENV) == '1'
+    if host_override and not use_edgerc:
+        return MOCK_CREDENTIALS, host_override
+    try:
+        credentials = load_credentials(edgerc_path, section)
+    except Exception:
+        if not replaying:
+            raise
+        credentials = MOCK_CREDENTIALS
+    return credentials, host_override or credentials.get('host', REPLAY_HOST)
+
+
+def replay_transport_options():
+    """Transport options for full-speed cassette replay: no throttling and no retry backoff.
+
+    Attempt counts stay as configured, so recorded retries are replayed in the same order.
+    """
+    return {
+        'rate_limiter': UnlimitedRateLimiter(),
+        'default_retry_policy': RetryPolicy(backoff_base=0.0, backoff_max=0.0),
+        'retry_policies': {prefix: RetryPolicy(max_attempts=policy.max_attempts, backoff_base=0.0, backoff_max=0.0)
+                           for prefix, policy in DEFAULT_RETRY_POLICIES.items()},
+    }
+
+
+def get_session(edgerc_path, section='default', pool_connections=DEFAULT_POOL_CONNECTIONS,
+                pool_maxsize=DEFAULT_POOL_MAXSIZE, host_override=None, cassette=None, **transport_options):
+    """Returns the warm session for the host of an .edgerc section, creating it on first use.
+
+    The host and credentials are resolved as in resolve_credentials(). cassette defaults to the one
+    configured by the AKAMAI_CASSETTE environment variables, if any. Sessions are shared per host,
+    credentials, pool size and cassette; asking for one of those with different transport_options
+    raises ValueError rather than silently ignoring them.
+    """
+    cassette = cassette or cassette_from_env()
+    replaying = cassette is not None and cassette.replaying
+    credentials, hostname = resolve_credentials(edgerc_path, section, host_override, replaying)
+    key = (hostname, tuple(sorted(credentials.items())), pool_connections, pool_maxsize, cassette)
+    with _lock:
+        cached = _sessions.get(key)
+        if cached is None:
+            session = create_session(credentials, pool_connections, pool_maxsize, cassette, **transport_options)
+            _sessions[key] = session, transport_options
+        else:
+            session, options = cached
+            if transport_options != options:
+                raise ValueError(f"A session for {hostname} already exists with other transport options; "
+                                 "call close_sessions() first")
+    return session, hostname
+
+
+def initialize_akamai_session(edgerc_path, section='default', pool_maxsize=DEFAULT_POOL_MAXSIZE, host_override=None):
+    """Initializes (or reuses) an Akamai EdgeGrid session."""
+    try:
+        return get_session(edgerc_path, section, pool_maxsize=pool_maxsize, host_override=host_override)
+    except Exception as e:
+        print(f"Error initializing Akamai session: {e}")
+        return None, None
+
+
+def close_sessions():
+    """Closes every pooled session and forgets cached credentials."""
+    with _lock:
+        for session, _ in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _credentials.clear()
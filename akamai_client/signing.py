@@ -0,0 +1,106 @@
+"""EdgeGrid request signer that reuses the derived signing key within each timestamp second."""
+import base64
+import hashlib
+import hmac
+import re
+import time
+import uuid
+from urllib.parse import urlsplit
+
+from akamai.edgegrid.edgegrid import read_body_content
+from requests.auth import AuthBase
+
+_SPACES = re.compile('\\s+')
+TIMESTAMP_FORMAT = '%Y%m%dT%H:%M:%S+0000'
+
+
+def _b64(digest):
+    return base64.b64encode(digest).decode('utf-8')
+
+
+class EdgeGridSigner:
+    """Produces EG1-HMAC-SHA256 Authorization headers identical to EdgeGridAuth's.
+
+    EdgeGrid signs with a key derived as HMAC(client_secret, timestamp), and timestamps have one-second
+    resolution, so the derived key (kept as a ready-to-copy HMAC object) and the timestamp string are
+    cached for the current second instead of being recomputed for every request. The constant
+    client_token/access_token part of the header is built once.
+    """
+
+    def __init__(self, client_token, client_secret, access_token, headers_to_sign=(), max_body=131072,
+                 clock=time.time):
+        self.client_token = client_token
+        self.access_token = access_token
+        self.headers_to_sign = [header.lower() for header in headers_to_sign]
+        self.max_body = max_body
+        self._secret = client_secret.encode('utf-8')
+        self._prefix = f"EG1-HMAC-SHA256 client_token={client_token};access_token={access_token};timestamp="
+        self._clock = clock
+        # (second, timestamp) and (timestamp, keyed HMAC); each is replaced atomically, so no lock is needed.
+        self._timestamp = (None, None)
+        self._key = (None, None)
+
+    def timestamp(self):
+        """Returns the EdgeGrid timestamp of the current second."""
+        second = int(self._clock())
+        cached_second, timestamp = self._timestamp
+        if cached_second != second:
+            timestamp = time.strftime(TIMESTAMP_FORMAT, time.gmtime(second))
+            self._timestamp = (second, timestamp)
+        return timestamp
+
+    def _keyed_hmac(self, timestamp):
+        cached_timestamp, keyed = self._key
+        if cached_timestamp != timestamp:
+            signing_key = _b64(hmac.new(self._secret, timestamp.encode('utf-8'), hashlib.sha256).digest())
+            keyed = hmac.new(signing_key.encode('utf-8'), digestmod=hashlib.sha256)
+            self._key = (timestamp, keyed)
+        return keyed.copy()
+
+    def _canonical_headers(self, headers):
+        if not self.headers_to_sign or not headers:
+            return ''
+        return '\t'.join(f"{name}:{_SPACES.sub(' ', headers[name].strip())}"
+                         for name in self.headers_to_sign if name in headers)
+
+    def _content_hash(self, method, body):
+        if method != 'POST' or not body:
+            return ''
+        content = read_body_content(body, self.max_body)
+        return _b64(hashlib.sha256(content).digest()) if content else ''
+
+    def sign(self, method, url, headers=None, body=None, timestamp=None, nonce=None):
+        """Returns the Authorization header value for a request.
+
+        headers must be case-insensitive (e.g. requests' CaseInsensitiveDict) when headers_to_sign is used.
+        """
+        timestamp = timestamp or self.timestamp()
+        nonce = nonce or str(uuid.uuid4())
+        auth_header = f"{self._prefix}{timestamp};nonce={nonce};"
+        parts = urlsplit(url)
+        netloc = (headers.get('Host') if headers else None) or parts.netloc
+        path = parts.path + ('?' + parts.query if parts.query else '')
+        data_to_sign = '\t'.join((method, parts.scheme, netloc, path, self._canonical_headers(headers),
+                                  self._content_hash(method, body), auth_header))
+        keyed = self._keyed_hmac(timestamp)
+        keyed.update(data_to_sign.encode('utf-8'))
+        return f"{auth_header}signature={_b64(keyed.digest())}"
+
+
+class EdgeGridSignerAuth(AuthBase):
+    """requests auth handler that signs with an EdgeGridSigner; a drop-in replacement for EdgeGridAuth."""
+
+    def __init__(self, client_token, client_secret, access_token, headers_to_sign=(), max_body=131072):
+        self.signer = EdgeGridSigner(client_token, client_secret, access_token, headers_to_sign, max_body)
+
+    def handle_redirect(self, response, **_):
+        if response.is_redirect:
+            request = response.request
+            request.headers['Authorization'] = self.signer.sign(request.method, response.headers['location'],
+                                                                request.headers, request.body)
+
+    def __call__(self, request):
+        request.headers['Authorization'] = self.signer.sign(request.method, request.url, request.headers,
+                                                            request.body)
+        request.register_hook('response', self.handle_redirect)
+        return request
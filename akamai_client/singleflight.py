@@ -0,0 +1,125 @@
+"""Single-flight coalescing of identical concurrent API calls."""
+import asyncio
+import threading
+from collections import Counter
+from urllib.parse import parse_qsl, urlsplit
+
+COALESCED_METHODS = frozenset({'GET', 'HEAD'})
+
+
+def request_key(method, url, params=None, headers=None):
+    """Returns a hashable key for a call: method, URL without query, and the sorted query and params pairs.
+
+    Query-string and params pairs are merged and sorted, so the same call spelled differently (parameter
+    order, params dict vs. query string) gets the same key; None values are dropped as requests does.
+    """
+    parts = urlsplit(url)
+    pairs = parse_qsl(parts.query, keep_blank_values=True)
+    items = params.items() if isinstance(params, dict) else (params or ())
+    for name, value in items:
+        values = value if isinstance(value, (list, tuple)) else [value]
+        pairs.extend((str(name), str(item)) for item in values if item is not None)
+    header_items = tuple(sorted((str(name).lower(), str(value)) for name, value in (headers or {}).items()))
+    return (method.upper(), f"{parts.scheme}://{parts.netloc.lower()}{parts.path}", tuple(sorted(pairs)), header_items)
+
+
+class LeaderCancelled(Exception):
+    """Set on a shared async call when the coroutine that was running it is cancelled; its followers retry."""
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Lets concurrent identical calls share one execution and its result.
+
+    The first caller for a key runs the call; callers arriving with the same key while it is in
+    flight wait for it and receive the same result (or exception) instead of issuing their own.
+    Nothing is cached once the call completes. `saved` counts calls avoided this way, per endpoint.
+    do() serves threads and do_async() serves coroutines on one event loop. When the leading coroutine
+    is cancelled, the first of its followers to wake up issues the call again and leads the rest.
+    """
+
+    def __init__(self):
+        self.saved = Counter()
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._futures = {}
+
+    def do(self, key, func, endpoint=None):
+        """Returns (result, shared): shared is True when the result came from another caller's call."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.saved[endpoint] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    async def do_async(self, key, factory, endpoint=None):
+        """Async counterpart of do(); factory is called without arguments and must return an awaitable."""
+        while True:
+            future = self._futures.get(key)
+            if future is None:
+                break
+            with self._lock:
+                self.saved[endpoint] += 1
+            try:
+                return await asyncio.shield(future), True
+            except LeaderCancelled:
+                # The leader's future is already gone, so the first follower here becomes the new leader.
+                with self._lock:
+                    self.saved[endpoint] -= 1
+
+        future = self._futures[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            future.set_exception(LeaderCancelled(f"the shared call for {endpoint or key} was cancelled"))
+            future.exception()  # Mark it retrieved; there may be no one waiting for it
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark it retrieved; the leader re-raises it
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            del self._futures[key]
+        return result, False
+
+    def total_saved(self):
+        with self._lock:
+            return sum(self.saved.values())
+
+    def report(self):
+        """Prints how many calls were served by another caller's in-flight request."""
+        with self._lock:
+            saved = dict(self.saved)
+        if not any(saved.values()):
+            print("No duplicate in-flight calls were coalesced.")
+            return
+        for endpoint, count in sorted(saved.items(), key=lambda item: str(item[0])):
+            print(f"Coalesced calls for {endpoint}: {count} saved")
@@ -0,0 +1,123 @@
+"""Session subclass that routes every Akamai call through the shared transport policies."""
+import re
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .ratelimit import AdaptiveRateLimiter
+from .retry import RetryBudget, RetryPolicy, RetryStats
+from .singleflight import COALESCED_METHODS, SingleFlight, request_key
+
+_ID_SEGMENT = re.compile(r'^[0-9]+$|^[A-Za-z]+[-_][0-9A-Za-z-]*[0-9][0-9A-Za-z-]*$')
+
+
+def endpoint_key(url):
+    """Returns the URL path with identifier segments replaced by {id}, for grouping calls per endpoint."""
+    path = urlsplit(url).path
+    return '/'.join('{id}' if _ID_SEGMENT.match(segment) else segment for segment in path.split('/'))
+
+
+def select_retry_policy(url, retry_policies, default_policy):
+    """Returns the policy of the longest path prefix in retry_policies that matches url, else default_policy."""
+    path = urlsplit(url).path
+    matches = [prefix for prefix in retry_policies if path.startswith(prefix)]
+    if not matches:
+        return default_policy
+    return retry_policies[max(matches, key=len)]
+
+
+def copy_response(response):
+    """Returns a new Response with the status, headers and body of a fully read one, for a caller sharing it.
+
+    The copy gets its own headers, history and cookies and no raw connection, so callers cannot affect
+    each other; the body bytes are immutable and shared as they are.
+    """
+    copied = response.__class__()
+    copied._content = response.content
+    copied._content_consumed = True
+    copied.status_code = response.status_code
+    copied.headers = CaseInsensitiveDict(response.headers)
+    copied.url = response.url
+    copied.encoding = response.encoding
+    copied.reason = response.reason
+    copied.elapsed = response.elapsed
+    copied.history = list(response.history)
+    copied.cookies = response.cookies.copy()
+    copied.request = response.request.copy() if response.request is not None else None
+    return copied
+
+
+class AkamaiSession(requests.Session):
+    """requests.Session that throttles and retries each request according to the shared policies.
+
+    retry_policies maps path prefixes to RetryPolicy objects; the longest matching prefix wins
+    and default_retry_policy covers everything else.
+
+    Concurrent identical GETs (same path, normalized params and headers) share one in-flight
+    request through single_flight; every caller but the one that sent it gets a copy_response(). Streamed
+    requests and requests with a body are always sent on their own. Pass single_flight=False
+    to disable coalescing.
+    """
+
+    def __init__(self, rate_limiter=None, default_retry_policy=None, retry_policies=None, retry_budget=None,
+                 single_flight=None):
+        super().__init__()
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.default_retry_policy = default_retry_policy or RetryPolicy()
+        self.retry_policies = dict(retry_policies or {})
+        self.retry_budget = retry_budget or RetryBudget()
+        self.retry_stats = RetryStats()
+        self.single_flight = SingleFlight() if single_flight is None else single_flight
+
+    def retry_policy_for(self, url):
+        return select_retry_policy(url, self.retry_policies, self.default_retry_policy)
+
+    def coalesce_key(self, method, url, args, kwargs):
+        """Returns the single-flight key of a call, or None if it must not share a request."""
+        if not self.single_flight or args or method.upper() not in COALESCED_METHODS or kwargs.get('stream'):
+            return None
+        if any(kwargs.get(name) is not None for name in ('data', 'json', 'files', 'auth', 'cookies')):
+            return None
+        return request_key(method, url, kwargs.get('params'), kwargs.get('headers'))
+
+    def request(self, method, url, *args, **kwargs):
+        key = self.coalesce_key(method, url, args, kwargs)
+        if key is None:
+            return self.send_with_retries(method, url, *args, **kwargs)
+        response, shared = self.single_flight.do(
+            key, lambda: self.send_with_retries(method, url, *args, **kwargs), endpoint_key(url))
+        return copy_response(response) if shared else response
+
+    def send_with_retries(self, method, url, *args, **kwargs):
+        policy = self.retry_policy_for(url)
+        endpoint = endpoint_key(url)
+        self.retry_budget.deposit()
+        attempt = 1
+        while True:
+            self.rate_limiter.acquire()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except requests.exceptions.RequestException as e:
+                retry = policy.retry_on_error(method, e)
+                response = None
+                error = e
+            else:
+                self.rate_limiter.update(response.status_code, response.headers)
+                retry = policy.retry_on_status(method, response.status_code)
+                error = None
+
+            budget_exhausted = False
+            if retry and attempt < policy.max_attempts:
+                budget_exhausted = not self.retry_budget.withdraw()
+            if not retry or attempt >= policy.max_attempts or budget_exhausted:
+                self.retry_stats.record(endpoint, attempt - 1, gave_up=retry, budget_exhausted=budget_exhausted)
+                if error is not None:
+                    raise error
+                return response
+
+            if response is not None:
+                response.close()
+            time.sleep(policy.backoff(attempt))
+            attempt += 1
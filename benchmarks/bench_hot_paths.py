@@ -0,0 +1,229 @@
+"""Throughput and peak-memory benchmarks for the data-shaping hot paths of the step scripts.
+
+Usage::
+
+    python benchmarks/bench_hot_paths.py                       # 1k, 100k and 1M records
+    python benchmarks/bench_hot_paths.py --sizes 1000 100000   # quicker run
+    python benchmarks/bench_hot_paths.py --save-baseline       # store results as the new baseline
+
+Every run is compared against benchmarks/baseline.json when it exists; a throughput drop or a
+peak-memory increase beyond --tolerance is reported as a regression and the exit status is 1.
+Datasets come from the mock server's deterministic generator, so runs are comparable.
+"""
+import argparse
+import csv
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from akamai_client.mockserver import FIRST_DEFINITION_ID, MockAkamaiData  # noqa: E402
+from akamai_client.scripts import ALERTS_DETAILS, CPCODES, TRAFFIC, load_script  # noqa: E402
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_TOLERANCE = 0.2
+DEFAULT_REPEAT = 3
+
+
+def cpcode_records(size):
+    data = MockAkamaiData(alerts=0, cpcodes=size)
+    return [data.cpcode(cpcode_id) for cpcode_id in data.cpcode_ids()]
+
+
+def alert_inputs(size):
+    data = MockAkamaiData(alerts=size, cpcodes=1000)
+    rows = []
+    for index in range(size):
+        summary = {key: str(value) for key, value in data.alert_summary(index).items()}
+        summary.setdefault('lastTriggered', '-')
+        rows.append((summary, data.alert_definition(FIRST_DEFINITION_ID + index)['definition']))
+    return rows
+
+
+def report_data(size):
+    return {'data': [{'cpcode': '1', 'edgeHits': str(1000 + i % 977), 'hitsOffload': str(50 + i % 50)}
+                     for i in range(size)]}
+
+
+def write_raw_cpcodes_csv(records, directory):
+    path = os.path.join(directory, "All_BENCH_CPcodes.csv")
+    with open(path, mode='w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=records[0].keys())
+        writer.writeheader()
+        writer.writerows(records)
+    return path
+
+
+def in_directory(workdir, func):
+    """Wraps func so it runs with workdir as the current directory (the scripts write relative paths)."""
+    def run():
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            func()
+        finally:
+            os.chdir(cwd)
+    return run
+
+
+def clean_helper_case(helper, column):
+    """Benchmarks a clean_* helper on the decoded API values that clean_cpcode_record passes it."""
+    def setup(scripts, size, workdir):
+        clean = getattr(scripts[CPCODES], helper)
+        values = [record[column] for record in cpcode_records(size)]
+        return lambda: [clean(value) for value in values]
+    return setup
+
+
+def write_cpcodes_case(scripts, size, workdir):
+    records = cpcode_records(size)
+    return in_directory(workdir, lambda: scripts[CPCODES].write_cpcodes_to_csv(records, "BENCH"))
+
+
+def clean_csv_case(scripts, size, workdir):
+    raw_csv = write_raw_cpcodes_csv(cpcode_records(size), workdir)
+    return in_directory(workdir, lambda: scripts[CPCODES].clean_csv(raw_csv, "BENCH"))
+
+
+def flatten_case(scripts, size, workdir):
+    details = scripts[ALERTS_DETAILS]
+    alerts = alert_inputs(size)
+    return lambda: [details.flatten_alert_definition(row, definition) for row, definition in alerts]
+
+
+def write_alerts_case(scripts, size, workdir):
+    details = scripts[ALERTS_DETAILS]
+    flattened = [details.flatten_alert_definition(row, definition) for row, definition in alert_inputs(size)]
+    output_csv = os.path.join(workdir, "alerts_details.csv")
+
+    def write_alerts():
+        for path in (output_csv, details.alert_store_path(output_csv)):
+            if os.path.exists(path):
+                os.remove(path)
+        details.write_filtered_alerts_to_csv(flattened, output_csv)
+    return write_alerts
+
+
+def traffic_averages_case(scripts, size, workdir):
+    report = report_data(size)
+    return lambda: scripts[TRAFFIC].calculate_traffic_averages(report, "1")
+
+
+# (name, setup) pairs; setup(scripts, size, workdir) builds one case's input and returns the function to time.
+CASES = [
+    ("clean_contracts", clean_helper_case("clean_contracts", 'contracts')),
+    ("clean_products", clean_helper_case("clean_products", 'products')),
+    ("clean_timezone", clean_helper_case("clean_timezone", 'overrideTimezone')),
+    ("clean_access_group", clean_helper_case("clean_access_group", 'accessGroup')),
+    ("write_cpcodes_to_csv", write_cpcodes_case),
+    ("clean_csv", clean_csv_case),
+    ("flatten_alert_definition", flatten_case),
+    ("write_filtered_alerts_to_csv", write_alerts_case),
+    ("calculate_traffic_averages", traffic_averages_case),
+]
+
+
+def measure(func, repeat=DEFAULT_REPEAT):
+    """Returns (best seconds per call, peak bytes); memory is traced separately so tracing does not skew time.
+
+    Small inputs are called in a loop (timeit.autorange) so each timed sample is long enough to be stable.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    seconds = min(timer.repeat(repeat=max(1, repeat), number=number)) / number
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def run(sizes, repeat=DEFAULT_REPEAT):
+    """Times every case at every size; each case's input is built just before it runs and dropped after."""
+    scripts = {name: load_script(name) for name in (ALERTS_DETAILS, CPCODES, TRAFFIC)}
+    results = {}
+    for size in sizes:
+        for name, setup in CASES:
+            with tempfile.TemporaryDirectory() as workdir:
+                # The scripts report progress with print(); keep the benchmark output readable.
+                stdout = sys.stdout
+                sys.stdout = open(os.devnull, 'w')
+                try:
+                    func = setup(scripts, size, workdir)
+                    seconds, peak = measure(func, repeat)
+                finally:
+                    sys.stdout.close()
+                    sys.stdout = stdout
+                del func
+            results[f"{name}[{size}]"] = {
+                'records': size,
+                'seconds': seconds,
+                'records_per_second': size / seconds if seconds else float('inf'),
+                'peak_bytes': peak,
+            }
+            print(f"{name:<30} {size:>9} records  {size / seconds:>14,.0f} rec/s  "
+                  f"{peak / 1024 / 1024:>9.1f} MiB peak")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Prints the change against the baseline and returns the names of regressed benchmarks."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        speed = result['records_per_second'] / previous['records_per_second'] - 1
+        memory = result['peak_bytes'] / max(1, previous['peak_bytes']) - 1
+        regressed = speed < -tolerance or memory > tolerance
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<42} throughput {speed:+7.1%}  peak memory {memory:+7.1%}"
+              f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data-shaping hot paths.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed relative throughput drop / memory growth (default 0.2)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="timed runs per case; the best counts")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat)
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.baseline} ({baseline.get('python', '?')}):")
+        regressions = compare(results, baseline.get('results', {}), args.tolerance)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(), 'results': results},
+                      f, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {args.baseline}")
+
+    if regressions and not args.save_baseline:
+        print(f"\n{len(regressions)} benchmark(s) regressed beyond {args.tolerance:.0%}.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
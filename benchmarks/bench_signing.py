@@ -0,0 +1,95 @@
+"""Micro-benchmark of EdgeGrid request signing: the stock EdgeGridAuth against akamai_client's EdgeGridSigner.
+
+Usage::
+
+    python benchmarks/bench_signing.py              # 20k signatures per signer
+    python benchmarks/bench_signing.py --requests 100000
+
+Both signers sign the same detail and report URLs. Before timing, the script checks that they
+produce the same Authorization header for a fixed timestamp and nonce.
+"""
+import argparse
+import os
+import sys
+import timeit
+from unittest import mock
+
+import requests
+from akamai.edgegrid import EdgeGridAuth
+from akamai.edgegrid import edgegrid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from akamai_client.signing import EdgeGridSigner  # noqa: E402
+
+DEFAULT_REQUESTS = 20000
+DEFAULT_REPEAT = 5
+CREDENTIALS = ('akab-client-token-xxxxxxxxxxxxxxxx', 'client-secret-xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx=',
+               'akab-access-token-xxxxxxxxxxxxxxxx')
+HOST = 'https://akab-xxxxxxxxxxxxxxxx-xxxxxxxxxxxxxxxx.luna.akamaiapis.net'
+
+
+def sample_urls(count):
+    urls = []
+    for index in range(count):
+        if index % 2:
+            urls.append(f"{HOST}/alerts/v2/alert-summaries/{100000 + index}/details?accountSwitchKey=F-AC-997250")
+        else:
+            urls.append(f"{HOST}/reporting-api/v1/reports/hits-by-cpcode/versions/1/report-data"
+                        f"?start=2024-01-01T00%3A00%3A00Z&end=2024-01-10T23%3A00%3A00Z&objectIds={500000 + index}"
+                        f"&metrics=edgeHits%2ChitsOffload&accountSwitchKey=F-AC-997250")
+    return urls
+
+
+def prepared_requests(urls):
+    return [requests.Request('GET', url, headers={'accept': 'application/json'}).prepare() for url in urls]
+
+
+def check_equivalence(urls):
+    """Returns True if both signers produce the same header for a fixed timestamp and nonce."""
+    auth = EdgeGridAuth(*CREDENTIALS)
+    signer = EdgeGridSigner(*CREDENTIALS)
+    timestamp, nonce = '20240101T00:00:00+0000', 'b6b5ad4e-0000-4000-8000-000000000000'
+    with mock.patch.object(edgegrid, 'eg_timestamp', return_value=timestamp), \
+            mock.patch.object(edgegrid, 'new_nonce', return_value=nonce):
+        for request in prepared_requests(urls):
+            expected = auth(request).headers['Authorization']
+            if signer.sign(request.method, request.url, request.headers, request.body, timestamp, nonce) != expected:
+                return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark EdgeGrid request signing.")
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS, help="signatures per timed run")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="timed runs per signer; the best counts")
+    args = parser.parse_args()
+
+    urls = sample_urls(args.requests)
+    if not check_equivalence(urls[:100]):
+        print("EdgeGridSigner and EdgeGridAuth disagree; not benchmarking.")
+        return 1
+
+    requests_to_sign = prepared_requests(urls)
+    auth = EdgeGridAuth(*CREDENTIALS)
+    signer = EdgeGridSigner(*CREDENTIALS)
+
+    def stock():
+        for request in requests_to_sign:
+            auth(request)
+
+    def memoized():
+        for request in requests_to_sign:
+            request.headers['Authorization'] = signer.sign(request.method, request.url, request.headers, request.body)
+
+    results = {}
+    for name, func in (("EdgeGridAuth", stock), ("EdgeGridSigner", memoized)):
+        seconds = min(timeit.repeat(func, repeat=max(1, args.repeat), number=1))
+        results[name] = args.requests / seconds
+        print(f"{name:<16} {results[name]:>12,.0f} signatures/s  {seconds / args.requests * 1e6:>7.2f} us each")
+    print(f"Speed-up: {results['EdgeGridSigner'] / results['EdgeGridAuth']:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
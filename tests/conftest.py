@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from akamai_client.latency import LATENCY_SUMMARY_ENV  # noqa: E402
+from akamai_client.mockserver import start_mock_server  # noqa: E402
+from akamai_client.session import close_sessions  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    """Runs every test in its own directory with no pooled sessions, so nothing leaks between tests."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv(LATENCY_SUMMARY_ENV, '')
+    yield tmp_path
+    close_sessions()
+
+
+@pytest.fixture
+def mock_server():
+    server = start_mock_server(alerts=20, cpcodes=10)
+    yield server
+    server.shutdown()
@@ -0,0 +1,62 @@
+import asyncio
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from akamai_client.aio import AsyncAkamaiClient  # noqa: E402
+from akamai_client.signing import EdgeGridSigner  # noqa: E402
+
+CREDENTIALS = {'client_token': 'akab-client', 'client_secret': 'secret', 'access_token': 'akab-access'}
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    """Answers every GET with {} and keeps the raw request target and Authorization header."""
+
+    def do_GET(self):
+        self.server.seen.append((self.path, self.headers['Authorization']))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def recording_server():
+    server = HTTPServer(('127.0.0.1', 0), RecordingHandler)
+    server.seen = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize('path, params', [
+    ('/alerts/v2/alert-summaries', {'accountSwitchKey': 'F-AC-1:2'}),
+    ('/reporting-api/v1/reports/hits-by-cpcode/versions/1/report-data',
+     {'start': '2024-01-01T00:00:00Z', 'objectIds': '1,2,3', 'filters': 'ca=cacheable', 'q': 'a b+c/d%e'}),
+    ('/alerts/v2/alert-summaries/a%2Fb/details', {'name': 'café [x]'}),
+])
+def test_bytes_on_the_wire_are_the_signed_path(recording_server, path, params):
+    host = f"http://127.0.0.1:{recording_server.server_port}"
+
+    async def fetch():
+        async with AsyncAkamaiClient(CREDENTIALS, host, single_flight=False) as client:
+            return await client.get(path, params)
+
+    response = asyncio.run(fetch())
+    assert response.status_code == 200
+    (wire_path, authorization), = recording_server.seen
+    timestamp, nonce = re.search(r'timestamp=([^;]+);nonce=([^;]+);', authorization).groups()
+    signer = EdgeGridSigner(CREDENTIALS['client_token'], CREDENTIALS['client_secret'], CREDENTIALS['access_token'])
+    # Signing what actually arrived must reproduce the header, i.e. nothing was re-encoded after signing.
+    assert signer.sign('GET', host + wire_path, timestamp=timestamp, nonce=nonce) == authorization
+    assert response.url == host + wire_path
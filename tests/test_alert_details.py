@@ -0,0 +1,46 @@
+import pytest
+
+from akamai_client.cpcode_index import CpcodeAlertIndex
+from akamai_client.csvsink import StreamingCsvWriter
+from akamai_client.scripts import ALERTS_DETAILS, load_script
+from akamai_client.session import HOST_OVERRIDE_ENV, close_sessions
+
+
+@pytest.fixture
+def details(mock_server, monkeypatch):
+    monkeypatch.setenv(HOST_OVERRIDE_ENV, mock_server.base_url)
+    summaries = mock_server.data.alert_summaries()['data']
+    writer = StreamingCsvWriter("alerts.csv")
+    writer.writerows(summaries)
+    writer.close()
+    return load_script(ALERTS_DETAILS), summaries
+
+
+def run_details(script, **kwargs):
+    script.read_and_process_alerts("/nonexistent/.edgerc", 'ACC', "alerts.csv", "details.csv", max_workers=4,
+                                   cache_path="detail_cache.sqlite3", **kwargs)
+    close_sessions()
+
+
+def test_untriggered_alerts_are_only_fetched_when_indexing(details, mock_server, monkeypatch):
+    script, summaries = details
+    triggered = [summary for summary in summaries if 'lastTriggered' in summary]
+    assert 0 < len(triggered) < len(summaries)
+
+    run_details(script)
+    assert mock_server.requests == len(triggered)
+
+    requested = mock_server.requests
+    run_details(script, index_path="index.sqlite3")
+    assert mock_server.requests - requested == len(summaries) - len(triggered)
+    index = CpcodeAlertIndex("index.sqlite3")
+    assert index.stats('ACC')[1] == len(summaries)
+    index.close()
+
+    # Untriggered details are served from the cache until they are older than the max age.
+    requested = mock_server.requests
+    run_details(script, index_path="index.sqlite3")
+    assert mock_server.requests == requested
+    monkeypatch.setattr(script, 'UNTRIGGERED_DETAIL_MAX_AGE', -1)
+    run_details(script, index_path="index.sqlite3")
+    assert mock_server.requests - requested == len(summaries) - len(triggered)
@@ -0,0 +1,55 @@
+import csv
+
+from akamai_client.alert_store import INSERTED, UNCHANGED, UPDATED, AlertStore, alert_store_path
+
+
+def read(filename):
+    with open(filename, newline='', encoding='utf-8') as infile:
+        return list(csv.DictReader(infile))
+
+
+def test_upsert_counts_inserts_updates_and_unchanged_rows():
+    store = AlertStore("alerts.sqlite3")
+    assert store.upsert({'definitionId': 1, 'name': 'a'}) == INSERTED
+    assert store.upsert({'definitionId': 2, 'name': 'b'}) == INSERTED
+    assert store.upsert({'definitionId': 1, 'name': 'a'}) == UNCHANGED
+    assert store.upsert({'definitionId': 1, 'name': 'renamed'}) == UPDATED
+    assert (store.inserted, store.updated, store.unchanged) == (2, 1, 1)
+    assert len(store) == 2
+    assert list(store.iter_rows()) == [{'definitionId': 1, 'name': 'renamed'}, {'definitionId': 2, 'name': 'b'}]
+    store.close()
+
+
+def test_export_keeps_one_row_per_definition_in_first_seen_order():
+    store = AlertStore("alerts.sqlite3")
+    for row in ({'definitionId': 2, 'name': 'b'}, {'definitionId': 1, 'name': 'a'},
+                {'definitionId': 2, 'name': 'b2', 'extra': 'x'}):
+        store.upsert(row)
+    assert store.export_csv("alerts.csv") == 2
+    store.close()
+    assert read("alerts.csv") == [{'definitionId': '2', 'name': 'b2', 'extra': 'x'},
+                                  {'definitionId': '1', 'name': 'a', 'extra': ''}]
+
+
+def test_imported_text_rows_are_unchanged_by_the_same_typed_row():
+    with open("alerts.csv", 'w', newline='', encoding='utf-8') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerows([['definitionId', 'threshold', 'note'], ['7', '50', ''], ['', '1', '']])
+    store = AlertStore(alert_store_path("alerts.csv"))
+    assert store.import_csv("alerts.csv") == 1
+    assert store.upsert({'definitionId': 7, 'threshold': 50, 'note': None}) == UNCHANGED
+    assert store.upsert({'definitionId': 7, 'threshold': 60}) == UPDATED
+    store.close()
+
+
+def test_rows_persist_across_reopening():
+    store = AlertStore("alerts.sqlite3")
+    store.upsert({'definitionId': 1, 'name': 'a'})
+    store.close()
+    store = AlertStore("alerts.sqlite3")
+    assert store.upsert({'definitionId': 1, 'name': 'a'}) == UNCHANGED
+    store.close()
+
+
+def test_store_path_sits_next_to_the_csv():
+    assert alert_store_path("out/ACC_alerts_details.csv") == "out/ACC_alerts_details.sqlite3"
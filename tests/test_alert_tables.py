@@ -0,0 +1,59 @@
+import os
+import sqlite3
+
+import pytest
+
+from akamai_client.alert_tables import AlertTableExport, normalize_alert_definition
+
+ROW = {'definitionId': '7', 'name': 'Origin errors', 'lastTriggered': '2024-03-01T00:00:00Z'}
+DEFINITION = {
+    'definitionId': 7,
+    'name': 'Origin errors',
+    'templateId': 19,
+    'isEnabled': True,
+    'emails': ['a@example.com', 'b@example.com'],
+    'fieldMap': {'cpcodes': ['500001', ' 500002 '], 'threshold': 50, 'comparison': 'above'},
+    'notifications': {'sendEmail': True},
+}
+
+
+def test_normalize_splits_a_definition_into_linked_rows():
+    tables = normalize_alert_definition(ROW, DEFINITION)
+    assert tables['definitions'][0][:5] == ('7', 'Origin errors', '19', 1, '2024-03-01T00:00:00Z')
+    assert tables['targets'] == [('7', '500001'), ('7', '500002')]
+    assert tables['recipients'] == [('7', 'a@example.com'), ('7', 'b@example.com')]
+    assert tables['parameters'] == [('7', 'threshold', '50'), ('7', 'comparison', 'above'),
+                                    ('7', 'notifications.sendEmail', 'true')]
+
+
+def test_sqlite_export_replaces_the_child_rows_of_a_definition(tmp_path):
+    path = str(tmp_path / "alerts.sqlite3")
+    export = AlertTableExport(path)
+    export.add(ROW, DEFINITION)
+    export.add(ROW, dict(DEFINITION, fieldMap={'cpcodes': ['500003']}))
+    assert export.definitions == 2
+    export.close()
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM definitions").fetchone() == (1,)
+    assert conn.execute("SELECT cpcode FROM targets").fetchall() == [('500003',)]
+    assert conn.execute("SELECT COUNT(*) FROM recipients").fetchone() == (2,)
+    conn.close()
+
+
+def test_parquet_export_skips_and_does_not_count_duplicates(tmp_path, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr("akamai_client.alert_tables._ROW_GROUP_SIZE", 2)
+    path = str(tmp_path / "alerts.parquet")
+    export = AlertTableExport(path)
+    for definition_id in (1, 2, 1, 3):
+        export.add({'definitionId': str(definition_id)}, dict(DEFINITION, definitionId=definition_id))
+    assert export.definitions == 3
+    assert not os.path.exists(os.path.join(path, "definitions.parquet"))
+    export.close()
+
+    definitions = pq.read_table(os.path.join(path, "definitions.parquet"))
+    assert definitions.column('definition_id').to_pylist() == ['1', '2', '3']
+    assert pq.ParquetFile(os.path.join(path, "targets.parquet")).metadata.num_row_groups > 1
+    assert sorted(os.listdir(path)) == sorted(f"{table}.parquet" for table in
+                                              ('definitions', 'targets', 'recipients', 'parameters'))
@@ -0,0 +1,65 @@
+import shutil
+
+import pytest
+
+from akamai_client.cassette import RECORD, REPLAY, Cassette, CassetteMissError
+from akamai_client.mockserver import FIRST_DEFINITION_ID
+from akamai_client.session import MOCK_CREDENTIALS, create_session
+
+REPORT_PATH = "/reporting-api/v1/reports/hits-by-cpcode/versions/1/report-data"
+
+
+def report_params(day):
+    return {'start': f"2024-01-{day:02d}T00:00:00Z", 'end': f"2024-01-{day + 1:02d}T00:00:00Z",
+            'objectIds': '1000000,1000001', 'accountSwitchKey': 'ACC'}
+
+
+def record(mock_server, path, calls):
+    cassette = Cassette(path, RECORD)
+    session = create_session(MOCK_CREDENTIALS, cassette=cassette)
+    responses = [session.get(mock_server.base_url + url, params=params) for url, params in calls]
+    return cassette, responses
+
+
+def test_round_trip(mock_server, tmp_path):
+    path = str(tmp_path / "run.jsonl.gz")
+    calls = [("/alerts/v2/alert-summaries", {'accountSwitchKey': 'ACC'}), (REPORT_PATH, report_params(1))]
+    cassette, recorded = record(mock_server, path, calls)
+    cassette.close()
+    served = mock_server.requests
+
+    session = create_session(MOCK_CREDENTIALS, cassette=Cassette(path, REPLAY))
+    replayed = [session.get("https://replay.invalid" + url, params=params) for url, params in calls]
+    assert [response.json() for response in replayed] == [response.json() for response in recorded]
+    assert [response.status_code for response in replayed] == [200, 200]
+    assert mock_server.requests == served
+    with pytest.raises(CassetteMissError):
+        session.get("https://replay.invalid/cprg/v1/cpcodes")
+
+
+def test_replay_ignores_the_report_window(mock_server, tmp_path):
+    path = str(tmp_path / "run.jsonl.gz")
+    cassette, recorded = record(mock_server, path, [(REPORT_PATH, report_params(1))])
+    cassette.close()
+
+    session = create_session(MOCK_CREDENTIALS, cassette=Cassette(path, REPLAY))
+    assert session.get("https://replay.invalid" + REPORT_PATH, params=report_params(20)).json() == recorded[0].json()
+
+
+def test_interrupted_recording_keeps_every_complete_line(mock_server, tmp_path):
+    path = str(tmp_path / "run.jsonl.gz")
+    calls = [(f"/alerts/v2/alert-summaries/{FIRST_DEFINITION_ID + index}/details", {}) for index in range(5)]
+    cassette, recorded = record(mock_server, path, calls)
+    # Copy the file while it is still open, as a killed process would leave it, then tear its last bytes.
+    crashed = str(tmp_path / "crashed.jsonl.gz")
+    shutil.copyfile(path, crashed)
+    with open(crashed, 'rb') as infile:
+        data = infile.read()
+    with open(crashed, 'wb') as outfile:
+        outfile.write(data[:-3])
+    cassette.close()
+
+    replay = Cassette(crashed, REPLAY)
+    session = create_session(MOCK_CREDENTIALS, cassette=replay)
+    for (url, params), response in list(zip(calls, recorded))[:4]:
+        assert session.get("https://replay.invalid" + url, params=params).json() == response.json()
@@ -0,0 +1,57 @@
+import os
+
+from akamai_client.checkpoint import CheckpointJournal
+
+
+def write_journal(path, count):
+    journal = CheckpointJournal(path, batch_size=2)
+    for index in range(count):
+        journal.record(index, {'definitionId': index, 'name': f"Alert {index}"})
+    journal.close()
+
+
+def test_torn_last_line_is_dropped_and_truncated(tmp_path):
+    path = str(tmp_path / "alerts.journal.jsonl")
+    write_journal(path, 5)
+    intact = os.path.getsize(path)
+    with open(path, 'ab') as outfile:
+        outfile.write(b'{"definitionId": "5", "details": {"na')
+
+    journal = CheckpointJournal(path, resume=True)
+    assert len(journal) == 5
+    assert os.path.getsize(path) == intact
+    assert journal.get(3) == {'definitionId': 3, 'name': "Alert 3"}
+    assert journal.get(5) is None
+    journal.record(5, {'definitionId': 5})
+    journal.close()
+
+    resumed = CheckpointJournal(path, resume=True)
+    assert len(resumed) == 6
+    assert resumed.get('5') == {'definitionId': 5}
+    assert resumed.get('0') == {'definitionId': 0, 'name': "Alert 0"}
+    assert resumed.resumed == 2
+    resumed.close()
+
+
+def test_line_that_is_not_json_ends_the_journal(tmp_path):
+    path = str(tmp_path / "alerts.journal.jsonl")
+    write_journal(path, 3)
+    with open(path, 'ab') as outfile:
+        outfile.write(b'\x00\x00\x00\n')
+
+    journal = CheckpointJournal(path, resume=True)
+    assert len(journal) == 3
+    journal.close()
+
+
+def test_completed_run_removes_the_journal_and_fresh_runs_discard_it(tmp_path):
+    path = str(tmp_path / "alerts.journal.jsonl")
+    write_journal(path, 2)
+    fresh = CheckpointJournal(path)
+    assert len(fresh) == 0
+    fresh.close()
+
+    journal = CheckpointJournal(path, resume=True)
+    journal.mark_complete()
+    journal.close()
+    assert not os.path.exists(path)
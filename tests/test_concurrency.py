@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+
+from akamai_client.concurrency import map_ordered
+
+
+def test_results_keep_the_input_order():
+    def slow_for_small(item):
+        time.sleep(0.001 * (10 - item))
+        return item * item
+
+    assert list(map_ordered(slow_for_small, range(10), max_workers=4)) == [item * item for item in range(10)]
+
+
+def test_calls_run_concurrently_up_to_max_workers():
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def work(item):
+        with lock:
+            running.append(item)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.remove(item)
+        return item
+
+    assert list(map_ordered(work, range(12), max_workers=3)) == list(range(12))
+    assert max(peak) == 3
+
+
+def test_a_lazy_iterator_is_only_read_ahead_by_twice_max_workers():
+    consumed = []
+
+    def items():
+        for item in range(100):
+            consumed.append(item)
+            yield item
+
+    results = map_ordered(lambda item: item, items(), max_workers=2)
+    assert next(results) == 0
+    assert len(consumed) == 4
+    results.close()
+
+
+def test_an_exception_is_raised_at_its_position():
+    def fail_on_three(item):
+        if item == 3:
+            raise ValueError(item)
+        return item
+
+    results = map_ordered(fail_on_three, range(6), max_workers=2)
+    assert [next(results) for _ in range(3)] == [0, 1, 2]
+    with pytest.raises(ValueError):
+        next(results)
@@ -0,0 +1,49 @@
+from akamai_client.cpcode_index import CpcodeAlertIndex, definition_cpcodes
+
+
+def test_definition_cpcodes_accepts_lists_scalars_and_missing_field_maps():
+    assert definition_cpcodes({'fieldMap': {'cpcodes': [1, ' 2 ']}}) == ['1', '2']
+    assert definition_cpcodes({'fieldMap': {'cpcodes': 3}}) == ['3']
+    assert definition_cpcodes({'fieldMap': None}) == []
+    assert definition_cpcodes({}) == []
+
+
+def test_update_replaces_the_cpcodes_of_a_definition():
+    index = CpcodeAlertIndex("index.sqlite3")
+    index.update('ACC', 1, ['10', '11'])
+    index.update('ACC', 2, ['11'])
+    index.update('ACC', 1, ['12'])
+    assert index.definitions_for('ACC', '10') == []
+    assert sorted(index.definitions_for('ACC', 11)) == ['2']
+    assert index.definitions_for('ACC', '12') == ['1']
+    assert index.stats('ACC') == (2, 2)
+    index.close()
+
+
+def test_accounts_are_kept_apart():
+    index = CpcodeAlertIndex("index.sqlite3")
+    index.update('ACC', 1, ['10'])
+    assert index.is_monitored('ACC', '10')
+    assert not index.is_monitored('OTHER', '10')
+    assert not index.is_monitored(None, '10')
+    index.close()
+
+
+def test_retain_drops_definitions_no_longer_listed():
+    index = CpcodeAlertIndex("index.sqlite3")
+    for definition_id, cpcodes in ((1, ['10']), (2, ['11', '12']), (3, ['12'])):
+        index.update('ACC', definition_id, cpcodes)
+    index.update('OTHER', 2, ['11'])
+    assert index.retain('ACC', ['1', '3']) == 2
+    assert index.stats('ACC') == (2, 2)
+    assert index.is_monitored('OTHER', '11')
+    index.close()
+
+
+def test_unmonitored_yields_inventory_cpcodes_in_order_and_survives_reopening():
+    index = CpcodeAlertIndex("index.sqlite3")
+    index.update('ACC', 1, ['11'])
+    index.close()
+    index = CpcodeAlertIndex("index.sqlite3")
+    assert list(index.unmonitored('ACC', ['12', ' 11 ', '10'])) == ['12', '10']
+    index.close()
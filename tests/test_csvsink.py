@@ -0,0 +1,48 @@
+import csv
+import os
+
+import pytest
+
+from akamai_client.csvsink import StreamingCsvWriter, write_rows_to_csv
+
+
+def read(filename):
+    with open(filename, newline='', encoding='utf-8') as infile:
+        return list(csv.reader(infile))
+
+
+def test_header_is_the_union_of_keys_and_earlier_rows_are_padded():
+    rows = [{'a': 1}, {'a': 2, 'b': None}, {'c': 'x', 'a': 3}]
+    assert write_rows_to_csv(rows, "out.csv") == 3
+    assert read("out.csv") == [['a', 'b', 'c'], ['1', '-', '-'], ['2', '-', '-'], ['3', '-', 'x']]
+
+
+def test_append_extends_the_existing_header():
+    write_rows_to_csv([{'a': 1, 'b': 2}], "out.csv")
+    write_rows_to_csv([{'b': 3, 'c': 4}], "out.csv", missing='', append=True)
+    assert read("out.csv") == [['a', 'b', 'c'], ['1', '2', ''], ['', '3', '4']]
+
+
+def test_nothing_is_written_without_rows_and_no_temporary_file_is_left():
+    assert write_rows_to_csv([], "out.csv") == 0
+    assert os.listdir('.') == []
+
+
+def test_rows_written_before_an_error_are_kept():
+    def rows():
+        yield {'a': 1}
+        raise RuntimeError("listing failed")
+
+    with pytest.raises(RuntimeError):
+        write_rows_to_csv(rows(), "out.csv")
+    assert read("out.csv") == [['a'], ['1']]
+    assert os.listdir('.') == ['out.csv']
+
+
+def test_discard_leaves_the_existing_output_alone():
+    write_rows_to_csv([{'a': 1}], "out.csv")
+    writer = StreamingCsvWriter("out.csv")
+    writer.writerow({'b': 2})
+    writer.discard()
+    assert read("out.csv") == [['a'], ['1']]
+    assert os.listdir('.') == ['out.csv']
@@ -0,0 +1,64 @@
+import sqlite3
+
+from akamai_client.detail_cache import DetailCache
+
+DETAILS = {'definition': {'definitionId': 1, 'fieldMap': {'cpcodes': ['10']}}}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        self.now += 1
+        return self.now
+
+
+def test_details_are_served_only_for_the_same_last_triggered():
+    cache = DetailCache("details.sqlite3")
+    cache.put('ACC', 1, '2024-01-01T00:00:00Z', DETAILS)
+    assert cache.get('ACC', '1', '2024-01-01T00:00:00Z') == DETAILS
+    assert cache.get('ACC', 1, '2024-02-01T00:00:00Z') is None
+    assert cache.get('OTHER', 1, '2024-01-01T00:00:00Z') is None
+    cache.put('ACC', 1, '2024-02-01T00:00:00Z', {'definition': {}})
+    assert cache.get('ACC', 1, '2024-01-01T00:00:00Z') is None
+    assert cache.stats() == {'hits': 1, 'misses': 3, 'hit_ratio': 0.25}
+    cache.close()
+
+
+def test_max_age_expires_entries_by_fetch_time_not_use():
+    clock = Clock()
+    cache = DetailCache("details.sqlite3", clock=clock)
+    cache.put('ACC', 1, '-', DETAILS)
+    assert cache.get('ACC', 1, '-', max_age=10) == DETAILS
+    clock.now += 20
+    assert cache.get('ACC', 1, '-', max_age=10) is None
+    assert cache.get('ACC', 1, '-') == DETAILS
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = DetailCache("details.sqlite3", max_entries=2, clock=Clock())
+    for definition_id in (1, 2):
+        cache.put('ACC', definition_id, '-', DETAILS)
+    cache.get('ACC', 1, '-')
+    cache.put('ACC', 3, '-', DETAILS)
+    cache.flush()
+    assert cache.get('ACC', 2, '-') is None
+    assert cache.get('ACC', 1, '-') == DETAILS
+    assert cache.get('ACC', 3, '-') == DETAILS
+    cache.close()
+
+
+def test_caches_without_fetch_times_are_upgraded_as_stale():
+    conn = sqlite3.connect("details.sqlite3")
+    conn.execute("CREATE TABLE alert_details (account TEXT NOT NULL, definition_id TEXT NOT NULL,"
+                 " last_triggered TEXT NOT NULL, payload TEXT NOT NULL, used_at REAL NOT NULL,"
+                 " PRIMARY KEY (account, definition_id))")
+    conn.execute("INSERT INTO alert_details VALUES ('ACC', '1', '-', '{\"definition\": {}}', 0)")
+    conn.commit()
+    conn.close()
+    cache = DetailCache("details.sqlite3")
+    assert cache.get('ACC', 1, '-', max_age=3600) is None
+    assert cache.get('ACC', 1, '-') == {'definition': {}}
+    cache.close()
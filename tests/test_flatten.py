@@ -0,0 +1,39 @@
+from akamai_client.flatten import Flattener
+
+
+def test_nested_scalars_become_dotted_columns_depth_first():
+    flattener = Flattener(prefix="definition_")
+    record = {'name': 'a', 'fieldMap': {'threshold': 50, 'window': {'minutes': 5}}, 'enabled': True}
+    assert list(flattener.flatten(record).items()) == [
+        ('definition_name', 'a'), ('definition_fieldMap.threshold', 50),
+        ('definition_fieldMap.window.minutes', 5), ('definition_enabled', True)]
+
+
+def test_arrays_and_empty_objects_are_json_text():
+    flattener = Flattener()
+    row = flattener.flatten({'emails': ['a@example.com', 'b@example.com'], 'fieldMap': {}, 'ids': [1, {'x': None}]})
+    assert row == {'emails': '["a@example.com","b@example.com"]', 'fieldMap': '{}', 'ids': '[1,{"x":null}]'}
+    assert flattener.schema == {'emails': 'json', 'fieldMap': 'json', 'ids': 'json'}
+
+
+def test_flatten_updates_the_given_row():
+    row = {'definitionId': 7}
+    assert Flattener(prefix="definition_").flatten({'name': 'a'}, row) is row
+    assert row == {'definitionId': 7, 'definition_name': 'a'}
+
+
+def test_schema_widens_across_records():
+    flattener = Flattener()
+    for record in ({'count': None, 'ratio': 1, 'label': 1},
+                   {'count': 3, 'ratio': 1.5, 'label': 'x'},
+                   {'count': None, 'ratio': 2, 'label': 2}):
+        flattener.flatten(record)
+    assert flattener.schema == {'count': 'int', 'ratio': 'float', 'label': 'str'}
+
+
+def test_reused_flattener_keeps_column_names_and_values_apart():
+    flattener = Flattener()
+    first = flattener.flatten({'a': {'b': 1}})
+    second = flattener.flatten({'a': {'b': 'two', 'c': [3]}})
+    assert first == {'a.b': 1}
+    assert second == {'a.b': 'two', 'a.c': '[3]'}
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from akamai_client.jsonstream import iter_json_array
+
+DOCUMENT = {
+    'links': [{'rel': 'self', 'href': '/alerts?page=1'}],
+    'data': [12.5, -0.25, 1e10, 3, 0, {'cpcodes': [1.5, 2E+2], 'name': 'sé "quoted"'}, True, None, [], {}],
+    'total': 1.25,
+}
+
+
+def encode(document):
+    return json.dumps(document).encode('utf-8')
+
+
+@pytest.mark.parametrize('document', [DOCUMENT, {'data': [-12.5e-3]}, {'data': [7], 'next': -1e3}])
+def test_every_split_offset_decodes_the_same(document):
+    text = encode(document)
+    for offset in range(len(text) + 1):
+        assert list(iter_json_array([text[:offset], text[offset:]], 'data')) == document['data'], offset
+
+
+def test_one_byte_chunks_decode_the_same():
+    text = encode(DOCUMENT)
+    assert list(iter_json_array((text[i:i + 1] for i in range(len(text))), 'data')) == DOCUMENT['data']
+
+
+def test_str_chunks_and_other_members_are_skipped():
+    text = json.dumps({'before': {'data': [1]}, 'data': ['a', 'b'], 'after': [1, 2]})
+    assert list(iter_json_array([text[:10], text[10:]], 'data')) == ['a', 'b']
+
+
+def test_missing_key_and_empty_object_yield_nothing():
+    assert list(iter_json_array([b'{"other": [1, 2]}'], 'data')) == []
+    assert list(iter_json_array([b'{}'], 'data')) == []
+    assert list(iter_json_array([b'{"data": []}'], 'data')) == []
+
+
+def test_elements_are_yielded_before_the_stream_ends():
+    def chunks():
+        yield b'{"data": [{"id": 1}, '
+        raise AssertionError("read past the first element")
+
+    assert next(iter_json_array(chunks(), 'data')) == {'id': 1}
+
+
+@pytest.mark.parametrize('text', [b'{"data": [1, 2', b'{"data": [1 2]}', b'[1, 2]', b'{"data": [12.]}'])
+def test_malformed_or_truncated_streams_raise(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array([text], 'data'))
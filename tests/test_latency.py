@@ -0,0 +1,30 @@
+from akamai_client.cassette import RECORD, REPLAY, Cassette
+from akamai_client.latency import LIVE, REPLAYED, LatencyRecorder
+from akamai_client.session import MOCK_CREDENTIALS, create_session
+
+
+def session_with(recorder, cassette):
+    session = create_session(MOCK_CREDENTIALS, cassette=cassette)
+    for adapter in session.adapters.values():
+        adapter.recorder = recorder
+    return session
+
+
+def test_replayed_timings_are_kept_apart_from_live_ones(mock_server, tmp_path, capsys):
+    path = str(tmp_path / "run.jsonl.gz")
+    url = "/alerts/v2/alert-summaries"
+    recorder = LatencyRecorder()
+    recording = Cassette(path, RECORD)
+    session_with(recorder, recording).get(mock_server.base_url + url, params={'accountSwitchKey': 'ACC'}).json()
+    recording.close()
+    session_with(recorder, Cassette(path, REPLAY)).get("https://replay.invalid" + url,
+                                                       params={'accountSwitchKey': 'ACC'}).json()
+
+    rows = recorder.summary()
+    assert {row['phase'] for row in rows if row['source'] == LIVE} >= {'ttfb', 'download', 'decode'}
+    assert {row['phase'] for row in rows if row['source'] == REPLAYED} == {'decode'}
+    assert all(row['account'] == 'ACC' for row in rows)
+
+    capsys.readouterr()
+    recorder.write_summary(str(tmp_path / "latency.csv"))
+    assert capsys.readouterr().out.count("\n") == 1
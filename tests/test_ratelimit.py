@@ -0,0 +1,59 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from akamai_client.mockserver import start_mock_server
+from akamai_client.ratelimit import AdaptiveRateLimiter, parse_retry_after
+from akamai_client.session import MOCK_CREDENTIALS, create_session
+
+NOW = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('120', 120.0),
+    ('0.5', 0.5),
+    ('-3', 0.0),
+    ('Mon, 01 Jan 2024 12:00:30 GMT', 30.0),
+    ('Mon, 01 Jan 2024 12:00:30 -0000', 30.0),
+    ('Mon, 01 Jan 2024 13:00:30 +0100', 30.0),
+    ('Mon, 01 Jan 2024 11:59:00 GMT', 0.0),
+    ('soon', None),
+    (None, None),
+])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value, now=NOW) == expected
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_429_halves_the_rate_and_pauses_until_retry_after():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(rate=8.0, clock=clock, sleep=None)
+    limiter.update(429, {'Retry-After': '2', 'X-RateLimit-Limit': '10', 'X-RateLimit-Remaining': '0'})
+    assert limiter.rate == 4.0
+    assert limiter.throttled == 1
+    assert limiter.reserve() == pytest.approx(2.0)
+    clock.now += 2.0
+    assert limiter.reserve() == 0.0
+    assert limiter.reserve() == 0.0
+    assert limiter.burst == 10
+
+
+def test_session_stays_within_the_server_quota():
+    server = start_mock_server(alerts=5, cpcodes=5, rate_limit=2, rate_per_second=20)
+    try:
+        session = create_session(MOCK_CREDENTIALS, single_flight=False)
+        url = f"{server.base_url}/alerts/v2/alert-summaries"
+        statuses = [session.get(url).status_code for _ in range(10)]
+        served = server.requests
+    finally:
+        server.shutdown()
+    assert statuses == [200] * 10
+    assert session.rate_limiter.burst == 2  # Adopted from X-RateLimit-Limit
+    assert served == 10 and session.rate_limiter.throttled == 0  # Paced below the quota, so no 429s
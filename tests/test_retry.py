@@ -0,0 +1,67 @@
+import random
+
+import requests
+
+from akamai_client.ratelimit import UnlimitedRateLimiter
+from akamai_client.retry import RetryBudget, RetryPolicy
+from akamai_client.transport import AkamaiSession
+
+
+def test_policy_only_resends_what_is_safe_to_resend():
+    policy = RetryPolicy()
+    assert policy.retry_on_status('GET', 503)
+    assert not policy.retry_on_status('GET', 404)
+    assert not policy.retry_on_status('POST', 503)
+    assert policy.retry_on_status('POST', 429)
+    assert policy.retry_on_error('GET', requests.exceptions.ReadTimeout())
+    assert not policy.retry_on_error('POST', requests.exceptions.ReadTimeout())
+    assert policy.retry_on_error('POST', requests.exceptions.ConnectTimeout())
+    assert not policy.retry_on_error('GET', ValueError())
+
+
+def test_backoff_is_jittered_below_an_exponential_ceiling():
+    policy = RetryPolicy(backoff_base=0.5, backoff_max=3.0, rng=random.Random(1))
+    for attempt, ceiling in ((1, 0.5), (2, 1.0), (3, 2.0), (4, 3.0), (10, 3.0)):
+        delays = [policy.backoff(attempt) for _ in range(200)]
+        assert all(0 <= delay <= ceiling for delay in delays)
+        assert max(delays) > ceiling / 2
+
+
+def test_budget_allows_min_retries_plus_a_share_of_the_requests():
+    budget = RetryBudget(ratio=0.5, min_retries=2)
+    assert [budget.withdraw() for _ in range(3)] == [True, True, False]
+    for _ in range(4):
+        budget.deposit()
+    assert [budget.withdraw() for _ in range(3)] == [True, True, False]
+    assert budget.retries == 4
+
+
+def session(**kwargs):
+    return AkamaiSession(rate_limiter=UnlimitedRateLimiter(),
+                         default_retry_policy=RetryPolicy(max_attempts=3, backoff_base=0), **kwargs)
+
+
+def test_failing_calls_stop_after_max_attempts(mock_server):
+    mock_server.error_rate = 1.0
+    client = session()
+    response = client.get(f"{mock_server.base_url}/cprg/v1/cpcodes")
+    assert response.status_code >= 500
+    assert mock_server.requests == 3
+    assert client.retry_stats.summary()['/cprg/v1/cpcodes'] == {
+        'requests': 1, 'retries': 2, 'gave_up': 1, 'budget_exhausted': 0}
+
+
+def test_an_exhausted_budget_stops_retrying(mock_server):
+    mock_server.error_rate = 1.0
+    client = session(retry_budget=RetryBudget(ratio=0, min_retries=1))
+    for _ in range(3):
+        client.get(f"{mock_server.base_url}/cprg/v1/cpcodes")
+    assert mock_server.requests == 3 + 1
+    assert client.retry_stats.summary()['/cprg/v1/cpcodes']['budget_exhausted'] == 3
+
+
+def test_client_errors_are_not_retried(mock_server):
+    client = session()
+    assert client.get(f"{mock_server.base_url}/no/such/path").status_code == 404
+    assert mock_server.requests == 1
+    assert client.retry_stats.total_retries() == 0
@@ -0,0 +1,29 @@
+import pytest
+
+from akamai_client.cassette import RECORD, Cassette
+from akamai_client.ratelimit import UnlimitedRateLimiter
+from akamai_client.session import get_session
+
+
+def test_sessions_are_shared_only_for_the_same_settings(mock_server, tmp_path):
+    def session(**kwargs):
+        return get_session("/nonexistent/.edgerc", host_override=mock_server.base_url, **kwargs)[0]
+
+    default = session()
+    assert session() is default
+    assert session(pool_maxsize=4) is not default
+    assert session(pool_maxsize=4) is session(pool_maxsize=4)
+
+    cassette = Cassette(str(tmp_path / "traffic.jsonl.gz"), RECORD)
+    recorded = session(cassette=cassette)
+    assert recorded is not default
+    assert session(cassette=cassette) is recorded
+    cassette.close()
+
+
+def test_other_transport_options_for_a_shared_session_raise(mock_server):
+    limiter = UnlimitedRateLimiter()
+    session = get_session("/nonexistent/.edgerc", host_override=mock_server.base_url, rate_limiter=limiter)[0]
+    assert get_session("/nonexistent/.edgerc", host_override=mock_server.base_url, rate_limiter=limiter)[0] is session
+    with pytest.raises(ValueError):
+        get_session("/nonexistent/.edgerc", host_override=mock_server.base_url, rate_limiter=UnlimitedRateLimiter())
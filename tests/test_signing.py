@@ -0,0 +1,43 @@
+from unittest import mock
+
+import pytest
+import requests
+from akamai.edgegrid import EdgeGridAuth, edgegrid
+
+from akamai_client.signing import EdgeGridSigner
+
+CREDENTIALS = ('akab-client-token-xxxxxxxxxxxxxxxx', 'client-secret-xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx=',
+               'akab-access-token-xxxxxxxxxxxxxxxx')
+HOST = 'https://akab-xxxxxxxxxxxxxxxx-xxxxxxxxxxxxxxxx.luna.akamaiapis.net'
+TIMESTAMP = '20240101T00:00:00+0000'
+NONCE = 'b6b5ad4e-0000-4000-8000-000000000000'
+
+
+@pytest.mark.parametrize('method, url, body, headers_to_sign', [
+    ('GET', '/alerts/v2/alert-summaries/100001/details?accountSwitchKey=F-AC-997250', None, ()),
+    ('GET', '/reporting-api/v1/reports/hits-by-cpcode/versions/1/report-data?start=2024-01-01T00%3A00%3A00Z'
+            '&objectIds=1%2C2&metrics=edgeHits%2ChitsOffload', None, ()),
+    ('GET', '/cprg/v1/cpcodes', None, ('X-Custom', 'Accept')),
+    ('POST', '/alerts/v2/search', b'{"query": "cpcode:1"}', ()),
+    ('POST', '/alerts/v2/search', b'x' * 200000, ()),
+], ids=['details', 'report', 'signed-headers', 'post', 'post-over-max-body'])
+def test_signer_matches_edgegrid_python(method, url, body, headers_to_sign):
+    request = requests.Request(method, HOST + url, data=body,
+                               headers={'accept': 'application/json', 'X-Custom': 'a   b'}).prepare()
+    auth = EdgeGridAuth(*CREDENTIALS, headers_to_sign=headers_to_sign)
+    with mock.patch.object(edgegrid, 'eg_timestamp', return_value=TIMESTAMP), \
+            mock.patch.object(edgegrid, 'new_nonce', return_value=NONCE):
+        expected = auth(request.copy()).headers['Authorization']
+    signer = EdgeGridSigner(*CREDENTIALS, headers_to_sign=headers_to_sign)
+    assert signer.sign(request.method, request.url, request.headers, request.body, TIMESTAMP, NONCE) == expected
+
+
+def test_cached_signing_key_follows_the_clock():
+    now = [1704067200.0]
+    signer = EdgeGridSigner(*CREDENTIALS, clock=lambda: now[0])
+    url = HOST + '/cprg/v1/cpcodes'
+    first = signer.sign('GET', url, nonce=NONCE)
+    now[0] += 1
+    second = signer.sign('GET', url, nonce=NONCE)
+    assert first != second
+    assert second == EdgeGridSigner(*CREDENTIALS).sign('GET', url, timestamp='20240101T00:00:01+0000', nonce=NONCE)
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+
+from akamai_client.singleflight import SingleFlight
+from akamai_client.transport import AkamaiSession, copy_response
+
+
+def test_followers_get_independent_responses(mock_server):
+    session = AkamaiSession()
+    url = f"{mock_server.base_url}/alerts/v2/alert-summaries"
+    release = threading.Event()
+    original = session.send_with_retries
+
+    def slow_send(*args, **kwargs):
+        release.wait(5)
+        return original(*args, **kwargs)
+
+    session.send_with_retries = slow_send
+    responses = []
+    threads = [threading.Thread(target=lambda: responses.append(session.get(url))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while session.single_flight.total_saved() < 2:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert mock_server.requests == 1
+    assert len({id(response) for response in responses}) == 3
+    responses[0].headers['X-Changed'] = '1'
+    assert sum('X-Changed' in response.headers for response in responses) == 1
+    assert all(response.json() == responses[0].json() for response in responses)
+
+
+def test_copy_response_does_not_share_the_connection(mock_server):
+    response = requests.get(f"{mock_server.base_url}/cprg/v1/cpcodes")
+    copied = copy_response(response)
+    assert copied.raw is None
+    assert copied.content == response.content
+    assert copied.headers == response.headers and copied.headers is not response.headers
+    assert copied.json() == response.json()
+
+
+def test_a_follower_takes_over_when_the_leader_is_cancelled():
+    flight = SingleFlight()
+
+    async def scenario():
+        entered = asyncio.Event()
+        calls = []
+
+        async def slow():
+            calls.append(len(calls))
+            if len(calls) == 1:
+                entered.set()
+                await asyncio.sleep(10)
+            await asyncio.sleep(0.01)
+            return 'result'
+
+        leader = asyncio.ensure_future(flight.do_async('key', slow))
+        await entered.wait()
+        followers = [asyncio.ensure_future(flight.do_async('key', slow, 'endpoint')) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert await asyncio.gather(*followers) == [('result', False), ('result', True), ('result', True)]
+        assert len(calls) == 2
+        assert flight.saved['endpoint'] == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,130 @@
+import csv
+import os
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from akamai_client.filter_memo import FILTERED, UNFILTERED, FilterMemo
+from akamai_client.mockserver import FIRST_CPCODE, start_mock_server
+from akamai_client.report_cache import ReportIntervalCache
+from akamai_client.scripts import TRAFFIC, load_script
+from akamai_client.session import HOST_OVERRIDE_ENV, MOCK_CREDENTIALS, close_sessions, create_session
+
+CPCODES = [str(FIRST_CPCODE + index) for index in range(10)]
+
+
+@pytest.fixture
+def traffic():
+    return load_script(TRAFFIC)
+
+
+def test_interval_cache_keys_on_both_ends(tmp_path):
+    cache = ReportIntervalCache(str(tmp_path / "reports.sqlite3"))
+    cache.put('ACC', '1', 'edgeHits', '', '2024-01-01T00:00:00Z', '2024-01-10T23:00:00Z', [{'edgeHits': 1}])
+    assert cache.get('ACC', '1', 'edgeHits', '', '2024-01-01T00:00:00Z', '2024-01-10T23:00:00Z') == [{'edgeHits': 1}]
+    assert cache.get('ACC', '1', 'edgeHits', '', '2024-01-01T00:00:00Z', '2024-01-11T23:00:00Z') is None
+    cache.put('ACC', '2', 'edgeHits', '', '2024-01-01T00:00:00Z', '2024-01-10T23:00:00Z', [])
+    assert cache.get('ACC', '2', 'edgeHits', '', '2024-01-01T00:00:00Z', '2024-01-10T23:00:00Z') == []
+    cache.close()
+
+
+def test_interval_cache_purges_days_before_the_window(tmp_path):
+    cache = ReportIntervalCache(str(tmp_path / "reports.sqlite3"))
+    cache.put('ACC', '1', 'edgeHits', '', '2024-01-01T00:00:00Z', '2024-01-02T00:00:00Z', [{'edgeHits': 1}])
+    cache.put('ACC', '1', 'edgeHits', '', '2024-01-02T00:00:00Z', '2024-01-03T00:00:00Z', [{'edgeHits': 2}])
+    assert cache.purge_before('2024-01-02T00:00:00Z') == 1
+    assert cache.get('ACC', '1', 'edgeHits', '', '2024-01-01T00:00:00Z', '2024-01-02T00:00:00Z') is None
+    assert cache.get('ACC', '1', 'edgeHits', '', '2024-01-02T00:00:00Z', '2024-01-03T00:00:00Z') == [{'edgeHits': 2}]
+    cache.close()
+
+
+def test_daily_runs_only_request_the_new_days(traffic, mock_server, tmp_path):
+    session = create_session(MOCK_CREDENTIALS)
+    cache = ReportIntervalCache(str(tmp_path / "reports.sqlite3"))
+    morning = datetime(2024, 3, 20, 1, 0, tzinfo=UTC)
+
+    def fetch(today):
+        return traffic.fetch_cached_reports(session, mock_server.base_url, CPCODES, 'ACC', True, cache, today)
+
+    def uncached(today):
+        start_date, end_date = traffic.report_window(today)
+        report = traffic.get_traffic_report(session, mock_server.base_url, CPCODES, 'ACC', True, start_date, end_date)
+        return traffic.split_report_by_cpcode(report, CPCODES)
+
+    first = fetch(morning)
+    assert first == uncached(morning)
+    requested = mock_server.requests
+    assert fetch(morning.replace(hour=23)) == first
+    assert mock_server.requests == requested
+
+    hits = cache.hits
+    for day in range(1, 4):
+        today = morning + timedelta(days=day)
+        expected = uncached(today)
+        requested = mock_server.requests
+        assert fetch(today) == expected
+        # One request covers the day that became complete and the new partial day; the rest is cached.
+        assert mock_server.requests == requested + 1
+        assert cache.hits - hits == len(CPCODES) * (len(traffic.daily_intervals(*traffic.report_window(today))) - 2)
+        hits = cache.hits
+
+    assert traffic.calculate_traffic_averages(expected[CPCODES[0]], CPCODES[0]) != \
+        traffic.calculate_traffic_averages(first[CPCODES[0]], CPCODES[0])
+    cache.close()
+
+
+def run_traffic(traffic, tmp_path, cpcodes=CPCODES, **kwargs):
+    with open("CPcodes.csv", 'w', newline='') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(['cpcodeId'])
+        writer.writerows([cpcode] for cpcode in cpcodes)
+    os.makedirs("Alerts", exist_ok=True)
+    memo_path = str(tmp_path / "memo.sqlite3")
+    traffic.fetch_and_analyze_traffic_report("/nonexistent/.edgerc", "CPcodes.csv", 'ACC', cache_path=None,
+                                             memo_path=memo_path, **kwargs)
+    close_sessions()
+    memo = FilterMemo(memo_path)
+    shapes = {cpcode: memo.get('ACC', cpcode) for cpcode in cpcodes}
+    memo.close()
+    return shapes
+
+
+def test_failed_filtered_request_is_not_memoized(traffic, mock_server, monkeypatch, tmp_path):
+    monkeypatch.setenv(HOST_OVERRIDE_ENV, mock_server.base_url)
+    get_traffic_report = traffic.get_traffic_report
+
+    def filtered_fails(session, hostname, cpcodes, account_switch_key=None, include_filters=True, *args, **kwargs):
+        if include_filters:
+            return None
+        return get_traffic_report(session, hostname, cpcodes, account_switch_key, include_filters, *args, **kwargs)
+
+    monkeypatch.setattr(traffic, 'get_traffic_report', filtered_fails)
+    assert set(run_traffic(traffic, tmp_path).values()) == {None}
+
+    monkeypatch.setattr(traffic, 'get_traffic_report', get_traffic_report)
+    shapes = run_traffic(traffic, tmp_path)
+    dormant = {cpcode for cpcode in CPCODES if mock_server.data.is_dormant(int(cpcode))}
+    assert shapes == {cpcode: UNFILTERED if cpcode in dormant else FILTERED for cpcode in CPCODES}
+
+
+def test_memo_skips_filtered_requests_for_known_unfiltered_cpcodes(traffic, monkeypatch, tmp_path, capsys):
+    server = start_mock_server(alerts=1, cpcodes=200, dormant_ratio=0.1)
+    try:
+        monkeypatch.setenv(HOST_OVERRIDE_ENV, server.base_url)
+        cpcodes = [str(FIRST_CPCODE + index) for index in range(200)]
+        dormant = [cpcode for cpcode in cpcodes if server.data.is_dormant(int(cpcode))]
+        assert dormant
+
+        run_traffic(traffic, tmp_path, cpcodes, batch_size=50)
+        first_requests = server.requests
+        first_output = open("Alerts/Traffic_by_CPcode.csv").read()
+        capsys.readouterr()
+
+        run_traffic(traffic, tmp_path, cpcodes, batch_size=50)
+        second_requests = server.requests - first_requests
+        # Four filtered batches of the active CP codes and one unfiltered batch of the dormant ones.
+        assert second_requests == 4 + 1 < first_requests
+        assert f"Filter memo: {first_requests - second_requests} report requests avoided" in capsys.readouterr().out
+        assert open("Alerts/Traffic_by_CPcode.csv").read() == first_output
+    finally:
+        server.shutdown()